@@ -1,22 +1,55 @@
+import asyncio
+import contextlib
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
-from api.dependencies import mongo_close, mongo_connect
-from api.routers import scrape
+from api.dependencies import (
+    db,
+    hot_queries,
+    mongo_close,
+    mongo_connect,
+    settings,
+    warmup_state,
+)
+from api.routers import health, scrape
+from api.warmup import warm_up
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     await mongo_connect()
+
+    # Warm up in the background: the API is live straight away, and reports ready
+    # through /health/ready once the pool and Mongo's cache are warm
+    warmup = None
+    if settings.warmup_enabled:
+        warmup = asyncio.create_task(
+            warm_up(
+                db,
+                warmup_state,
+                hot_queries,
+                settings.min_pool_size,
+                settings.warmup_timeout,
+            )
+        )
+    else:
+        warmup_state.mark_ready(warm=False)
+
     try:
         yield
     finally:
+        if warmup:
+            warmup.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await warmup
+        hot_queries.save()
         await mongo_close()
 
 
 app = FastAPI(title="DNL Web Scraper", docs_url="/docs", lifespan=lifespan)
 app.include_router(scrape.router)
+app.include_router(health.router)
 add_pagination(app)
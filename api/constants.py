@@ -4,7 +4,20 @@ MONGO_URI_ENV_VAR = "MONGO_URI"
 MONGO_DEFAULT_DB = "scraping_db"
 MONGO_DB_ENV_VAR = "MONGO_DB"
 MONGO_SCRAPED_COLLECTION = "scraped_items"
+MONGO_CHANGES_COLLECTION = "changes"
 MONGO_DEFAULT_MAX_CONNECTIONS_COUNT = 10
 MONGO_MAX_CONNECTIONS_COUNT_ENV_VAR = "MONGO_MAX_CONNECTIONS_COUNT"
 MONGO_DEFAULT_MIN_CONNECTIONS_COUNT = 2
 MONGO_MIN_CONNECTIONS_COUNT_ENV_VAR = "MONGO_MIN_CONNECTIONS_COUNT"
+
+# Snapshot
+SNAPSHOT_DEFAULT_PATH = "/data/snapshots/catalogue.parquet"
+SNAPSHOT_PATH_ENV_VAR = "SNAPSHOT_PATH"
+
+# Warm-up
+WARMUP_ENABLED_ENV_VAR = "WARMUP_ENABLED"
+WARMUP_TIMEOUT_ENV_VAR = "WARMUP_TIMEOUT"
+WARMUP_DEFAULT_TIMEOUT = 30
+WARMUP_QUERIES_PATH_ENV_VAR = "WARMUP_QUERIES_PATH"
+WARMUP_DEFAULT_QUERIES_PATH = "/data/warmup/hot_queries.json"
+WARMUP_MAX_QUERIES = 20
@@ -13,28 +13,55 @@ from api.constants import (
     MONGO_MAX_CONNECTIONS_COUNT_ENV_VAR,
     MONGO_MIN_CONNECTIONS_COUNT_ENV_VAR,
     MONGO_URI_ENV_VAR,
+    SNAPSHOT_DEFAULT_PATH,
+    SNAPSHOT_PATH_ENV_VAR,
+    WARMUP_DEFAULT_QUERIES_PATH,
+    WARMUP_DEFAULT_TIMEOUT,
+    WARMUP_ENABLED_ENV_VAR,
+    WARMUP_MAX_QUERIES,
+    WARMUP_QUERIES_PATH_ENV_VAR,
+    WARMUP_TIMEOUT_ENV_VAR,
 )
+from api.warmup import HotQueries, WarmupState
 
 
 class CommonSettings:
     mongo_uri = os.getenv(MONGO_URI_ENV_VAR, MONGO_DEFAULT_URI)
     db_name = os.getenv(MONGO_DB_ENV_VAR, MONGO_DEFAULT_DB)
+    snapshot_path = os.getenv(SNAPSHOT_PATH_ENV_VAR, SNAPSHOT_DEFAULT_PATH)
+    min_pool_size = int(
+        os.getenv(
+            MONGO_MIN_CONNECTIONS_COUNT_ENV_VAR, MONGO_DEFAULT_MIN_CONNECTIONS_COUNT
+        )
+    )
+    max_pool_size = int(
+        os.getenv(
+            MONGO_MAX_CONNECTIONS_COUNT_ENV_VAR, MONGO_DEFAULT_MAX_CONNECTIONS_COUNT
+        )
+    )
+    warmup_enabled = os.getenv(WARMUP_ENABLED_ENV_VAR, "1").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+    warmup_timeout = float(os.getenv(WARMUP_TIMEOUT_ENV_VAR, WARMUP_DEFAULT_TIMEOUT))
+    warmup_queries_path = os.getenv(
+        WARMUP_QUERIES_PATH_ENV_VAR, WARMUP_DEFAULT_QUERIES_PATH
+    )
 
 
 settings = CommonSettings()
 db = MongoDB(settings.mongo_uri, settings.db_name)
+hot_queries = HotQueries(settings.warmup_queries_path, WARMUP_MAX_QUERIES)
+warmup_state = WarmupState()
 
 
 async def mongo_connect() -> None:
     logger.info(f"Connecting to Mongo @ {db.mongo_uri}")
     db.client = AsyncIOMotorClient(
         db.mongo_uri,
-        minPoolSize=os.getenv(
-            MONGO_MAX_CONNECTIONS_COUNT_ENV_VAR, MONGO_DEFAULT_MIN_CONNECTIONS_COUNT
-        ),
-        maxPoolSize=os.getenv(
-            MONGO_MIN_CONNECTIONS_COUNT_ENV_VAR, MONGO_DEFAULT_MAX_CONNECTIONS_COUNT
-        ),
+        minPoolSize=settings.min_pool_size,
+        maxPoolSize=settings.max_pool_size,
     )
 
 
@@ -49,3 +76,11 @@ async def get_settings() -> CommonSettings:
 
 async def get_db() -> MongoDB:
     return db
+
+
+async def get_hot_queries() -> HotQueries:
+    return hot_queries
+
+
+async def get_warmup_state() -> WarmupState:
+    return warmup_state
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, BeforeValidator, Field
 
@@ -16,6 +16,25 @@ class Product(BaseModel):
     part_number: str = Field(...)
 
 
+class Change(BaseModel):
+    id: PyObjectId = Field(..., alias="_id")
+    generation: int = Field(...)
+    change: Literal["added", "removed", "changed"] = Field(...)
+    make: str = Field(...)
+    category: str | None = Field(...)
+    model: str = Field(...)
+    part_number: str = Field(...)
+    part_type: str | None = Field(...)
+    previous_part_type: str | None = Field(...)
+
+
 class DeleteResponse(BaseModel):
     deleted_count: int = Field(...)
     message: str = Field(...)
+
+
+class Readiness(BaseModel):
+    ready: bool = Field(...)
+    warm: bool = Field(...)
+    boot_seconds: float | None = Field(...)
+    steps: dict[str, float] = Field(...)
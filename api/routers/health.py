@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Response
+
+from api.dependencies import get_warmup_state
+from api.models import Readiness
+from api.warmup import WarmupState
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"],
+)
+
+
+@router.get("/live")
+async def get_liveness() -> dict[str, str]:
+    """
+    Report that the API process is up, whether or not it is warm yet.
+    """
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    response_model=Readiness,
+    responses={503: {"model": Readiness, "description": "Still warming up"}},
+)
+async def get_readiness(
+    response: Response,
+    state: WarmupState = Depends(get_warmup_state),
+) -> Readiness:
+    """
+    Report whether start-up warm-up is done, so load balancers can hold traffic
+    back until then. Also reports how long the boot and each warm-up step took.
+    """
+    if not state.ready:
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+    return Readiness(
+        ready=state.ready,
+        warm=state.warm,
+        boot_seconds=state.boot_seconds,
+        steps=state.steps,
+    )
@@ -1,14 +1,17 @@
+import os
 from http import HTTPStatus
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import FileResponse
 from fastapi_pagination import Page
 from fastapi_pagination.ext.motor import paginate as motor_paginate
 
 from api.clients.mongo import MongoDB
-from api.constants import MONGO_SCRAPED_COLLECTION
-from api.dependencies import get_db
-from api.models import DeleteResponse, Product
+from api.constants import MONGO_CHANGES_COLLECTION, MONGO_SCRAPED_COLLECTION
+from api.dependencies import CommonSettings, get_db, get_hot_queries, get_settings
+from api.models import Change, DeleteResponse, Product
+from api.warmup import HotQueries
 
 router = APIRouter(
     prefix="/scrape",
@@ -33,6 +36,7 @@ async def get_products(
         None, title="Part Type", description="Filter by part type", min_length=0
     ),
     db: MongoDB = Depends(get_db),
+    hot_queries: HotQueries = Depends(get_hot_queries),
 ) -> Page[Product]:
     """
     Retrieve a list of products from the database, based on different query parameters.
@@ -50,6 +54,9 @@ async def get_products(
     if part_type:
         filter_query["part_type"] = part_type
 
+    # Replayed on the next start-up to warm the cache
+    hot_queries.record(filter_query)
+
     scraped_col = db.get_collection(MONGO_SCRAPED_COLLECTION)
 
     # The _id field will be automatically included by motor_paginate
@@ -58,6 +65,60 @@ async def get_products(
     return result
 
 
+@router.get("/changes", response_model=Page[Change])
+async def get_changes(
+    since: int = Query(
+        0,
+        title="Since",
+        description="Only return changes of crawl generations after this one",
+        ge=0,
+    ),
+    db: MongoDB = Depends(get_db),
+) -> Page[Change]:
+    """
+    Retrieve the parts added, removed or changed by each crawl since a generation.
+
+    Syncing clients pass the highest generation they have seen, instead of
+    downloading the whole catalogue again.
+    """
+    changes_col = db.get_collection(MONGO_CHANGES_COLLECTION)
+
+    result = await motor_paginate(
+        changes_col,
+        query_filter={"generation": {"$gt": since}},
+        sort=[("generation", 1), ("_id", 1)],
+    )
+
+    return result
+
+
+@router.get(
+    "/snapshot",
+    response_class=FileResponse,
+    responses={200: {"content": {"application/vnd.apache.parquet": {}}}},
+)
+async def get_snapshot(
+    settings: CommonSettings = Depends(get_settings),
+) -> FileResponse:
+    """
+    Download the whole catalogue of the last complete crawl as a Parquet file.
+
+    Bulk consumers get everything in one compressed, columnar read instead of paging
+    through /products.
+    """
+    if not os.path.exists(settings.snapshot_path):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="No snapshot available yet, the first crawl has not finished",
+        )
+
+    return FileResponse(
+        settings.snapshot_path,
+        media_type="application/vnd.apache.parquet",
+        filename=os.path.basename(settings.snapshot_path),
+    )
+
+
 @router.delete(
     "/products/{product_id}",
     response_model=DeleteResponse,
@@ -0,0 +1,37 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import Response
+
+from api.routers import health
+from api.warmup import WarmupState
+
+
+class TestGetReadiness:
+    """Tests for the readiness endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_while_warming_up(self):
+        """Test traffic is held back until warm-up is done."""
+        response = Response()
+
+        result = await health.get_readiness(response, state=WarmupState())
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert result.ready is False
+
+    @pytest.mark.asyncio
+    async def test_ready(self):
+        """Test readiness and boot timings are reported once warm."""
+        state = WarmupState()
+        state.steps["pool"] = 0.1
+        state.mark_ready(warm=True)
+        response = Response()
+
+        result = await health.get_readiness(response, state=state)
+
+        assert response.status_code == HTTPStatus.OK
+        assert result.ready is True
+        assert result.warm is True
+        assert result.boot_seconds is not None
+        assert result.steps == {"pool": 0.1}
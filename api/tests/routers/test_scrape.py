@@ -0,0 +1,67 @@
+from http import HTTPStatus
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from api.clients.mongo import MongoDB
+from api.constants import MONGO_CHANGES_COLLECTION
+from api.dependencies import CommonSettings
+from api.routers import scrape
+
+
+@pytest.fixture
+def mongo_db():
+    """Create a MongoDB instance with a mocked client."""
+    mongo = MongoDB(mongo_uri="mongodb://localhost:27017", db_name="test_db")
+    mongo.client = MagicMock()
+    return mongo
+
+
+class TestGetChanges:
+    """Tests for the change feed endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_changes_since(self, mocker, mongo_db):
+        """Test only changes of later generations are returned, oldest first."""
+        page = MagicMock()
+        paginate = mocker.patch.object(
+            scrape, "motor_paginate", AsyncMock(return_value=page)
+        )
+
+        result = await scrape.get_changes(since=1700000000, db=mongo_db)
+
+        assert result is page
+        paginate.assert_awaited_once_with(
+            mongo_db.get_collection(MONGO_CHANGES_COLLECTION),
+            query_filter={"generation": {"$gt": 1700000000}},
+            sort=[("generation", 1), ("_id", 1)],
+        )
+
+
+class TestGetSnapshot:
+    """Tests for the snapshot download endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_snapshot(self, tmp_path):
+        """Test the snapshot file is served as Parquet."""
+        snapshot = tmp_path / "catalogue.parquet"
+        snapshot.write_bytes(b"PAR1")
+        settings = CommonSettings()
+        settings.snapshot_path = str(snapshot)
+
+        response = await scrape.get_snapshot(settings=settings)
+
+        assert response.path == str(snapshot)
+        assert response.media_type == "application/vnd.apache.parquet"
+
+    @pytest.mark.asyncio
+    async def test_get_snapshot_missing(self, tmp_path):
+        """Test a 404 is returned before the first crawl has finished."""
+        settings = CommonSettings()
+        settings.snapshot_path = str(tmp_path / "catalogue.parquet")
+
+        with pytest.raises(HTTPException) as error:
+            await scrape.get_snapshot(settings=settings)
+
+        assert error.value.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,78 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.clients.mongo import MongoDB
+from api.warmup import HotQueries, warm_up, WarmupState
+
+
+@pytest.fixture
+def hot_queries(tmp_path):
+    return HotQueries(str(tmp_path / "warmup" / "hot_queries.json"), max_queries=2)
+
+
+@pytest.fixture
+def mongo_db():
+    """Create a MongoDB instance with a mocked client."""
+    mongo = MongoDB(mongo_uri="mongodb://localhost:27017", db_name="test_db")
+    mongo.client = MagicMock()
+    mongo.client.admin.command = AsyncMock(return_value={"ok": 1})
+    collection = mongo.client.__getitem__.return_value.__getitem__.return_value
+    collection.index_information = AsyncMock(return_value={"_id_": {}})
+    collection.count_documents = AsyncMock(return_value=0)
+    collection.find.return_value.hint.return_value.limit.return_value.to_list = (
+        AsyncMock(return_value=[])
+    )
+    collection.find.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+    return mongo
+
+
+class TestHotQueries:
+    """Tests for the log of frequent product queries."""
+
+    def test_save_and_load(self, hot_queries):
+        """Test the most frequent queries are saved and loaded back in order."""
+        for query in ({"make": "Volvo"}, {"make": "Cat"}, {"make": "Cat"}, {}):
+            hot_queries.record(query)
+
+        hot_queries.save()
+
+        assert hot_queries.load() == [{"make": "Cat"}, {"make": "Volvo"}]
+
+    def test_load_missing(self, hot_queries):
+        """Test a first boot has nothing to replay."""
+        assert hot_queries.load() == []
+
+
+class TestWarmUp:
+    """Tests for the start-up warm-up."""
+
+    @pytest.mark.asyncio
+    async def test_warm_up(self, mongo_db, hot_queries):
+        """Test the pool is opened and the API reported ready and warm."""
+        hot_queries.record({"make": "Volvo"})
+        hot_queries.save()
+        state = WarmupState()
+
+        await warm_up(mongo_db, state, hot_queries, min_pool_size=3, timeout=5)
+
+        assert mongo_db.client.admin.command.await_count == 3
+        assert state.ready is True
+        assert state.warm is True
+        assert set(state.steps) == {"pool", "indexes", "hot_queries"}
+
+    @pytest.mark.asyncio
+    async def test_warm_up_timeout(self, mongo_db, hot_queries):
+        """Test a stuck warm-up still ends with the API ready, but not warm."""
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        mongo_db.client.admin.command = hang
+        state = WarmupState()
+
+        await warm_up(mongo_db, state, hot_queries, min_pool_size=1, timeout=0.01)
+
+        assert state.ready is True
+        assert state.warm is False
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from collections.abc import Coroutine
+
+from loguru import logger
+
+from api.clients.mongo import MongoDB
+from api.constants import MONGO_CHANGES_COLLECTION, MONGO_SCRAPED_COLLECTION
+
+# Page size used by fastapi-pagination when the client doesn't pick one
+DEFAULT_PAGE_SIZE = 50
+
+
+class HotQueries:
+    def __init__(self, path: str, max_queries: int) -> None:
+        """Access log of the product filters clients actually use.
+
+        Filters are counted as requests come in and the most frequent ones are saved
+        on shutdown, so the next boot can warm up exactly the pages its clients are
+        about to ask for.
+
+        Args:
+            path: the JSON file the hot queries are saved to and loaded from.
+            max_queries: the number of queries to keep.
+        """
+        self.path = path
+        self.max_queries = max_queries
+        self.counts: Counter[tuple[tuple[str, str], ...]] = Counter()
+
+    def record(self, filter_query: dict[str, str]) -> None:
+        self.counts[tuple(sorted(filter_query.items()))] += 1
+        # Keep the log bounded, however many distinct filters are seen
+        if len(self.counts) > self.max_queries * 10:
+            self.counts = Counter(dict(self.counts.most_common(self.max_queries)))
+
+    def load(self) -> list[dict[str, str]]:
+        """Read the hot queries saved by the previous run, most frequent first."""
+        try:
+            with open(self.path) as file:
+                return json.load(file)[: self.max_queries]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read hot queries from {self.path}: {str(e)}")
+            return []
+
+    def save(self) -> None:
+        """Save the most frequent queries of this run, if there were any."""
+        if not self.counts:
+            return
+        queries = [dict(key) for key, _ in self.counts.most_common(self.max_queries)]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w") as file:
+                json.dump(queries, file)
+        except OSError as e:
+            logger.warning(f"Could not save hot queries to {self.path}: {str(e)}")
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        """Progress of the start-up warm-up, reported by the readiness endpoint."""
+        self.ready = False
+        self.warm = False
+        self.started_at = time.perf_counter()
+        self.boot_seconds: float | None = None
+        self.steps: dict[str, float] = {}
+
+    def mark_ready(self, warm: bool) -> None:
+        self.ready = True
+        self.warm = warm
+        self.boot_seconds = time.perf_counter() - self.started_at
+
+
+async def _timed(state: WarmupState, step: str, coro: Coroutine) -> None:
+    started = time.perf_counter()
+    await coro
+    state.steps[step] = time.perf_counter() - started
+
+
+async def open_pool(db: MongoDB, min_pool_size: int) -> None:
+    """Open the minimum pool now, rather than on the first requests."""
+    await asyncio.gather(
+        *(db.client.admin.command("ping") for _ in range(max(1, min_pool_size)))
+    )
+
+
+async def touch_indexes(db: MongoDB) -> None:
+    """Page in the start of every index of the collections the API reads."""
+    for name in (MONGO_SCRAPED_COLLECTION, MONGO_CHANGES_COLLECTION):
+        collection = db.get_collection(name)
+        for index in await collection.index_information():
+            await collection.find({}).hint(index).limit(DEFAULT_PAGE_SIZE).to_list(None)
+
+
+async def run_hot_queries(db: MongoDB, queries: list[dict[str, str]]) -> None:
+    """Run the first page of each hot query, as `get_products` would."""
+    collection = db.get_collection(MONGO_SCRAPED_COLLECTION)
+    await asyncio.gather(
+        *(collection.count_documents(query) for query in queries),
+        *(
+            collection.find(query).limit(DEFAULT_PAGE_SIZE).to_list(None)
+            for query in queries
+        ),
+    )
+
+
+async def warm_up(
+    db: MongoDB,
+    state: WarmupState,
+    hot_queries: HotQueries,
+    min_pool_size: int,
+    timeout: float,
+) -> None:
+    """Warm the connection pool and Mongo's cache, then report readiness.
+
+    Warm-up is best effort: if it fails or runs out of time, the API is reported
+    ready anyway (but not warm), rather than kept out of rotation.
+
+    Args:
+        db: the Mongo client wrapper.
+        state: where to report progress and readiness.
+        hot_queries: the queries to replay.
+        min_pool_size: the number of connections to open up front.
+        timeout: the seconds warm-up may take at most.
+    """
+    queries = hot_queries.load()
+
+    async def steps() -> None:
+        await _timed(state, "pool", open_pool(db, min_pool_size))
+        await _timed(state, "indexes", touch_indexes(db))
+        await _timed(state, "hot_queries", run_hot_queries(db, queries))
+
+    warm = False
+    try:
+        await asyncio.wait_for(steps(), timeout)
+        warm = True
+    except TimeoutError:
+        logger.warning(f"Warm-up did not finish within {timeout}s")
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {str(e)}")
+
+    state.mark_ready(warm)
+    logger.info(
+        f"Ready after {state.boot_seconds:.2f}s (warm: {warm}, "
+        f"{len(queries)} hot queries, steps: {state.steps})"
+    )
@@ -0,0 +1,109 @@
+"""Measure the API's cold start: import time, and boot time until it serves requests.
+
+Each run starts a fresh interpreter, so nothing is cached between runs. Boot time
+is measured up to the first response from /openapi.json, which every version of
+the API serves without touching Mongo. If the API has a readiness endpoint, the
+time until /health/ready reports ready is measured too. That part needs a
+reachable Mongo (MONGO_URI) to mean anything, so it is skipped with --no-ready.
+
+To compare against an earlier version, point the benchmark at a checkout of it:
+
+    git worktree add /tmp/api-before <revision>
+    python -m benchmarks.api_cold_start --checkout /tmp/api-before
+
+Usage:
+    python -m benchmarks.api_cold_start [--runs N] [--port P] [--checkout DIR]
+        [--no-ready]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import api.app; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def import_seconds(checkout: str) -> float:
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        capture_output=True,
+        check=True,
+        cwd=checkout,
+        text=True,
+    )
+    return float(output.stdout)
+
+
+def wait_for(url: str, started: float, timeout: float) -> float | None:
+    """Poll a URL until it answers 200, or None if it doesn't exist (404)."""
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url):  # noqa: S310
+                return time.perf_counter() - started
+        except urllib.error.HTTPError as e:
+            if e.code == HTTPStatus.NOT_FOUND:
+                return None
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not available after {timeout}s")
+
+
+def boot_seconds(
+    checkout: str, port: int, ready: bool, timeout: float = 60.0
+) -> tuple[float, float | None]:
+    started = time.perf_counter()
+    server = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "uvicorn", "api.app:app", "--port", str(port)],
+        cwd=checkout,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        serving = wait_for(f"{base}/openapi.json", started, timeout)
+        warm = wait_for(f"{base}/health/ready", started, timeout) if ready else None
+        return serving, warm
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--checkout", default=".", help="the API checkout to time")
+    parser.add_argument(
+        "--no-ready", dest="ready", action="store_false", help="skip /health/ready"
+    )
+    args = parser.parse_args()
+
+    imports = [import_seconds(args.checkout) for _ in range(args.runs)]
+    print(f"import api.app: median {statistics.median(imports) * 1000:.0f} ms")
+
+    boots = [
+        boot_seconds(args.checkout, args.port, args.ready) for _ in range(args.runs)
+    ]
+    serving = [boot[0] for boot in boots]
+    print(
+        f"process start to first response: median "
+        f"{statistics.median(serving) * 1000:.0f} ms"
+    )
+    ready = [boot[1] for boot in boots if boot[1] is not None]
+    if ready:
+        print(
+            f"process start to ready: median {statistics.median(ready) * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measure the memory held by pending-request meta on a synthetic catalogue.
+
+Compares the old per-request ``dict`` copies against ``CrawlContext``. Strings are
+rebuilt for every simulated page, the same way selectors hand back fresh strings
+for each response.
+
+Only the meta dicts are measured, not real pending ``scrapy.Request`` objects: the
+rest of a request (URL, headers, callbacks) costs the same either way, so the
+saving per pending request is the same but makes up a smaller share of its total.
+
+Usage:
+    python -m benchmarks.crawl_context_memory [makes] [categories] [models]
+"""
+
+import sys
+import tracemalloc
+from collections.abc import Callable
+
+from scraper.context import CrawlContext
+
+
+def _fresh(value: str) -> str:
+    # Force a new string object, as parsing a new response would.
+    return "".join(list(value))
+
+
+def dict_meta(makes: int, categories: int, models: int) -> list[dict]:
+    pending = []
+    for m in range(makes):
+        product = {"make": _fresh(f"make {m}")}
+        for c in range(categories):
+            new_product = dict(product)
+            new_product["category"] = _fresh(f"category {c}")
+            for n in range(models):
+                model_product = dict(new_product)
+                model_product["model"] = _fresh(f"model {n}")
+                pending.append({"product": model_product, "depth": 3})
+    return pending
+
+
+def context_meta(makes: int, categories: int, models: int) -> list[dict]:
+    pending = []
+    for m in range(makes):
+        context = CrawlContext.for_make(_fresh(f"make {m}"))
+        for c in range(categories):
+            category_context = context.with_category(_fresh(f"category {c}"))
+            for n in range(models):
+                pending.append(
+                    {
+                        "context": category_context.with_model(_fresh(f"model {n}")),
+                        "depth": 3,
+                    }
+                )
+    return pending
+
+
+def measure(build: Callable[[int, int, int], list[dict]], *sizes: int) -> int:
+    tracemalloc.start()
+    pending = build(*sizes)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pending
+    return current
+
+
+def main() -> None:
+    sizes = tuple(int(arg) for arg in sys.argv[1:4]) or (40, 30, 60)
+    pending_count = sizes[0] * sizes[1] * sizes[2]
+    print(f"{pending_count} pending model requests (makes x categories x models)")
+
+    for name, build in (("dict copies", dict_meta), ("CrawlContext", context_meta)):
+        used = measure(build, *sizes)
+        print(
+            f"{name:>14}: {used / 1024 / 1024:8.2f} MiB"
+            f" ({used / pending_count:6.1f} bytes/request)"
+        )
+
+
+if __name__ == "__main__":
+    main()
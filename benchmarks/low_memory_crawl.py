@@ -0,0 +1,115 @@
+"""Measure the scheduler's peak memory as the catalogue grows, with LOW_MEMORY_CRAWL.
+
+Runs Scrapy's own scheduler, with the dupefilter and queues the crawl settings pick,
+over a synthetic catalogue of model page requests: every request is enqueued (and
+seen once more, as a duplicate) before the queue is drained, the worst case for the
+frontier. The peak is measured with tracemalloc from the point the scheduler opens,
+so the fixed cost of the interpreter and of Scrapy itself is left out, and every
+measurement gets its own interpreter. The default crawl keeps pending requests and
+every fingerprint in memory; the low-memory one keeps them on disk, in the job
+directory, and in a fixed-size Bloom filter.
+
+Usage:
+    python -m benchmarks.low_memory_crawl [requests ...]
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import scrapy
+from scrapy.core.scheduler import Scheduler
+from scrapy.utils.test import get_crawler
+
+from scraper import settings as crawl_settings
+from scraper.context import CrawlContext
+from scraper.main import ProductsSpider
+
+# The settings name their classes relative to the scraper directory, which Scrapy puts
+# on the path when run from there (next to scrapy.cfg)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "scraper"))
+
+MODES = {
+    "default": {},
+    "LOW_MEMORY_CRAWL": {
+        "LOW_MEMORY_CRAWL": True,
+        "DUPEFILTER_BLOOM_CAPACITY": crawl_settings.DUPEFILTER_BLOOM_CAPACITY,
+        "DUPEFILTER_BLOOM_ERROR_RATE": crawl_settings.DUPEFILTER_BLOOM_ERROR_RATE,
+    },
+}
+
+
+def model_requests(
+    spider: ProductsSpider, start: int, stop: int
+) -> list[scrapy.Request]:
+    context = CrawlContext.for_make("Volvo").with_category("engine")
+    return [
+        scrapy.Request(
+            f"https://www.urparts.com/index.cfm/page/catalogue/Volvo/engine/EC{n}",
+            callback=spider.parse_part,
+            meta={"context": context.with_model(f"EC{n}"), "depth": 3},
+        )
+        for n in range(start, stop)
+    ]
+
+
+def measure(settings: dict, count: int) -> tuple[int, dict]:
+    with tempfile.TemporaryDirectory() as job_dir:
+        if settings.get("LOW_MEMORY_CRAWL"):
+            # A crawl would get a fresh job directory in ProductsSpider.from_crawler
+            settings = {**settings, "JOBDIR": job_dir}
+        crawler = get_crawler(ProductsSpider, settings)
+        spider = ProductsSpider.from_crawler(crawler)
+        crawler.spider = spider
+
+        tracemalloc.start()
+        scheduler = Scheduler.from_crawler(crawler)
+        scheduler.open(spider)
+        # Built in chunks, as responses hand them over, not all held at once
+        for start in range(0, count, 1000):
+            for request in model_requests(spider, start, min(start + 1000, count)):
+                scheduler.enqueue_request(request)
+                scheduler.enqueue_request(request.replace())
+        while scheduler.next_request() is not None:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        scheduler.close("finished")
+        tracemalloc.stop()
+        return peak, crawler.stats.get_stats()
+
+
+def run_mode(mode: str, count: int) -> tuple[int, int]:
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "benchmarks.low_memory_crawl", "--mode", mode]
+        + [str(count)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return tuple(json.loads(output.stdout.splitlines()[-1]))
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--mode"]:
+        # Child process: measure a single mode and catalogue size
+        peak, stats = measure(MODES[sys.argv[2]], int(sys.argv[3]))
+        print(json.dumps([peak, stats.get("scheduler/enqueued/disk", 0)]))
+        return
+
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 20_000, 40_000, 80_000]
+    print("peak scheduler memory, enqueuing every model page request then draining")
+
+    for mode in MODES:
+        for count in counts:
+            peak, disk = run_mode(mode, count)
+            print(
+                f"{mode:>16}, {count:>6} requests: {peak / 1024 / 1024:8.2f} MiB"
+                f" ({disk} queued on disk)"
+            )
+
+
+if __name__ == "__main__":
+    main()
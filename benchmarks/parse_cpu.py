@@ -0,0 +1,147 @@
+"""Measure the CPU time per model page spent by `parse_part`, logging included.
+
+Compares the spider as it was before the logging changes (eager f-string messages,
+one warning per page without parts) with the current one, both logging every page
+to a synchronous sink, and with structured logging (sampled, JSON lines through a
+queued sink). Every run of a mode gets its own interpreter, with a warm-up pass
+before the measured one, and writes its records to a temporary file. The modes are
+run in interleaved rounds and the median is reported. One model page in ten has no
+parts.
+
+The spider before the logging changes is imported from a checkout of it, given with
+--checkout (without one, only the current spider is measured):
+
+    git worktree add /tmp/scraper-before <revision before scraper/logs.py>
+    python -m benchmarks.parse_cpu --checkout /tmp/scraper-before
+
+Usage:
+    python -m benchmarks.parse_cpu [--pages N] [--parts N] [--rounds N]
+        [--checkout DIR]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import scrapy
+from loguru import logger
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from scraper.context import CrawlContext
+from scraper.main import ProductsSpider
+
+CURRENT = str(Path(__file__).resolve().parents[1])
+MODES = {
+    "before: eager, every page, sync sink": ("checkout", {}),
+    "after: lazy, every page, sync sink": ("current", {}),
+    "after: structured, 1% sampled, queued": (
+        "current",
+        {"LOG_STRUCTURED": True, "LOG_SAMPLE_RATES": {"parse_part": 0.01}},
+    ),
+}
+WARMUP_PAGES = 500
+
+
+def model_page(number: int, parts: int) -> HtmlResponse:
+    url = f"https://www.urparts.com/index.cfm/page/catalogue/Volvo/engine/EC{number}"
+    context = CrawlContext.for_make("Volvo").with_category("engine")
+    request = scrapy.Request(
+        url, meta={"context": context.with_model(f"EC{number}"), "depth": 3}
+    )
+    items = "".join(
+        f'<li><a href="/part/{part}">{part:08d} - Part<span>Gasket</span></a></li>'
+        for part in range(0 if number % 10 == 9 else parts)
+    )
+    body = f'<html><div class="allparts"><ul>{items}</ul></div></html>'
+    return HtmlResponse(url, body=body.encode(), encoding="utf-8", request=request)
+
+
+def measure(mode: str, page_count: int, parts: int) -> float:
+    # Each mode runs with its own checkout first on the path, so this is the spider
+    # of that checkout
+    settings = MODES[mode][1]
+    crawler = get_crawler(ProductsSpider, settings)
+    spider = ProductsSpider.from_crawler(crawler)
+    pages = [model_page(number, parts) for number in range(page_count)]
+
+    with tempfile.TemporaryFile("w") as sink:
+        logger.remove()
+        if crawler.settings.getbool("LOG_STRUCTURED"):
+            from scraper.logs import configure_logging
+
+            configure_logging(crawler.settings, sink=sink)
+        else:
+            logger.add(sink, level="DEBUG")
+
+        for page in pages[:WARMUP_PAGES]:
+            for _ in spider.parse_part(page):
+                pass
+        logger.complete()
+
+        started = time.process_time()
+        for page in pages:
+            for _ in spider.parse_part(page):
+                pass
+        # Include the time to drain the queued sink
+        logger.complete()
+        return (time.process_time() - started) / len(pages)
+
+
+def run_mode(mode: str, checkout: str, page_count: int, parts: int) -> float:
+    """Measure one run of a mode in a fresh interpreter, importing from a checkout."""
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, __file__, "--mode", mode]
+        + ["--pages", str(page_count), "--parts", str(parts)],
+        capture_output=True,
+        check=True,
+        cwd=checkout,
+        env={**os.environ, "PYTHONPATH": checkout},
+        text=True,
+    )
+    return float(output.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--parts", type=int, default=20, help="parts per model page")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--checkout", help="a checkout of the spider before the logging changes"
+    )
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: measure a single run of one mode
+        print(measure(args.mode, args.pages, args.parts))
+        return
+
+    checkouts = {"checkout": args.checkout, "current": CURRENT}
+    modes = [mode for mode, (source, _) in MODES.items() if checkouts[source]]
+    print(
+        f"{args.pages} model pages with {args.parts} parts each (1 in 10 empty), "
+        f"median of {args.rounds} runs"
+    )
+
+    results: dict[str, list[float]] = {mode: [] for mode in modes}
+    for _ in range(args.rounds):
+        for mode in modes:
+            checkout = str(Path(checkouts[MODES[mode][0]]).resolve())
+            results[mode].append(run_mode(mode, checkout, args.pages, args.parts))
+
+    for mode, runs in results.items():
+        print(
+            f"{mode:>38}: {statistics.median(runs) * 1e6:8.1f} µs CPU/page "
+            f"(min {min(runs) * 1e6:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
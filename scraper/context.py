@@ -0,0 +1,26 @@
+import sys
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlContext:
+    """Immutable, compact context passed down the crawl through request meta.
+
+    Each crawl step derives a new context from its parent instead of copying a
+    dict, and every string is interned, so the thousands of pending requests that
+    share a make/category/model all point at the same string objects.
+    """
+
+    make: str
+    category: str | None = None
+    model: str | None = None
+
+    @classmethod
+    def for_make(cls, make: str) -> "CrawlContext":
+        return cls(make=sys.intern(make))
+
+    def with_category(self, category: str) -> "CrawlContext":
+        return replace(self, category=sys.intern(category))
+
+    def with_model(self, model: str) -> "CrawlContext":
+        return replace(self, model=sys.intern(model))
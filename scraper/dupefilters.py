@@ -0,0 +1,179 @@
+import math
+from pathlib import Path
+
+import scrapy
+import scrapy.crawler
+from loguru import logger
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.statscollectors import StatsCollector
+from scrapy.utils.job import job_dir
+from scrapy.utils.request import RequestFingerprinterProtocol
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Fixed-size probabilistic set of request fingerprints.
+
+        The bit array is sized up front for `capacity` keys at `error_rate`, so its
+        memory does not grow with the crawl. Past `capacity` the false positive rate
+        climbs above the budget instead.
+
+        Args:
+            capacity: the number of keys the filter is sized for.
+            error_rate: the target false positive rate at `capacity` keys.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def _indexes(self, key: bytes) -> list[int]:
+        # Double hashing over the (already uniformly distributed) fingerprint bytes
+        first = int.from_bytes(key[:8], "big")
+        second = int.from_bytes(key[8:16], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(
+            self.bits[index // 8] & (1 << index % 8) for index in self._indexes(key)
+        )
+
+    def add(self, key: bytes) -> bool:
+        """Add a key to the filter.
+
+        Args:
+            key: a request fingerprint (at least 16 bytes).
+
+        Returns:
+            bool: True if the key was (probably) already present, False otherwise.
+        """
+        seen = True
+        for index in self._indexes(key):
+            byte, bit = divmod(index, 8)
+            if not self.bits[byte] & (1 << bit):
+                seen = False
+                self.bits[byte] |= 1 << bit
+        if not seen:
+            self.count += 1
+        return seen
+
+    def load(self, bits: bytes) -> None:
+        """Restore the filter from a previously saved bit array.
+
+        Args:
+            bits: the saved bit array, which must match this filter's size.
+        """
+        self.bits[:] = bits
+        # Estimate how many keys produced this many set bits
+        ones = sum(byte.bit_count() for byte in self.bits)
+        if ones < self.size:
+            self.count = round(
+                -self.size / self.hash_count * math.log(1 - ones / self.size)
+            )
+        else:
+            self.count = self.capacity
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """The expected false positive rate for the number of keys added so far."""
+        fill = 1 - math.exp(-self.hash_count * self.count / self.size)
+        return fill**self.hash_count
+
+
+class BloomDupeFilter(BaseDupeFilter):
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        stats: StatsCollector,
+        fingerprinter: RequestFingerprinterProtocol,
+        path: str | None = None,
+        debug: bool = False,
+    ):
+        """Request dupefilter with bounded memory.
+
+        Drop-in replacement for Scrapy's `RFPDupeFilter`, whose fingerprint set grows
+        with the catalogue. A false positive drops a request that was never crawled,
+        so the filter's size and estimated error rate are written to the crawl stats.
+
+        Args:
+            capacity: the number of requests the filter is sized for.
+            error_rate: the false positive budget at `capacity` requests.
+            stats: the crawl stats, to report the filter's trade-off in.
+            fingerprinter: computes the fingerprint of each request.
+            path: the job directory to persist the filter in, for resumable crawls.
+            debug: log every filtered request instead of only the first one.
+        """
+        self.stats = stats
+        self.fingerprinter = fingerprinter
+        self.debug = debug
+        self.log_dupes = True
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.file = Path(path, "requests.bloom") if path else None
+
+        if self.file and self.file.exists():
+            bits = self.file.read_bytes()
+            if len(bits) == len(self.bloom.bits):
+                self.bloom.load(bits)
+            else:
+                logger.warning(
+                    f"Ignoring {self.file}: it was sized for a different capacity"
+                )
+
+    @classmethod
+    def from_crawler(cls, crawler: scrapy.crawler.Crawler) -> "BloomDupeFilter":
+        return cls(
+            capacity=crawler.settings.getint("DUPEFILTER_BLOOM_CAPACITY"),
+            error_rate=crawler.settings.getfloat("DUPEFILTER_BLOOM_ERROR_RATE"),
+            stats=crawler.stats,
+            fingerprinter=crawler.request_fingerprinter,
+            path=job_dir(crawler.settings),
+            debug=crawler.settings.getbool("DUPEFILTER_DEBUG"),
+        )
+
+    def request_seen(self, request: scrapy.Request) -> bool:
+        return self.bloom.add(self.fingerprinter.fingerprint(request))
+
+    def close(self, reason: str) -> None:
+        """Report the filter's memory/accuracy trade-off and persist it.
+
+        Args:
+            reason: the reason the spider closed.
+        """
+        self.stats.set_value("dupefilter/bloom/capacity", self.bloom.capacity)
+        self.stats.set_value("dupefilter/bloom/error_rate", self.bloom.error_rate)
+        self.stats.set_value("dupefilter/bloom/bytes", len(self.bloom.bits))
+        self.stats.set_value("dupefilter/bloom/hashes", self.bloom.hash_count)
+        self.stats.set_value("dupefilter/bloom/inserted", self.bloom.count)
+        self.stats.set_value(
+            "dupefilter/bloom/estimated_error_rate", self.bloom.estimated_error_rate
+        )
+        # Upper bound on the requests wrongly dropped, as the rate grew with the count
+        self.stats.set_value(
+            "dupefilter/bloom/expected_false_positives",
+            int(self.bloom.estimated_error_rate * self.bloom.count),
+        )
+
+        if self.bloom.count > self.bloom.capacity:
+            logger.warning(
+                f"Bloom dupefilter over capacity ({self.bloom.count} > "
+                f"{self.bloom.capacity}), estimated false positive rate is "
+                f"{self.bloom.estimated_error_rate:.2%}"
+            )
+
+        if self.file:
+            self.file.write_bytes(self.bloom.bits)
+
+    def log(self, request: scrapy.Request, spider: scrapy.Spider) -> None:
+        if self.debug:
+            logger.debug(f"Filtered duplicate request: {request}")
+        elif self.log_dupes:
+            logger.debug(
+                f"Filtered duplicate request: {request} - no more duplicates will be "
+                "shown (see DUPEFILTER_DEBUG to show all duplicates)"
+            )
+            self.log_dupes = False
+
+        self.stats.inc_value("dupefilter/filtered", spider=spider)
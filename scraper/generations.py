@@ -0,0 +1,114 @@
+import time
+
+import pymongo
+import pymongo.database
+
+# The fields identifying a part across crawls
+PART_KEY = ("make", "category", "model", "part_number")
+
+
+def new_generation() -> int:
+    """Generation IDs are the crawl's start time, so they sort in crawl order."""
+    return int(time.time())
+
+
+def _part_type_in(generation: int | None) -> dict:
+    # Wrapped in a document so that a null part_type still sorts above "not in this
+    # generation" (null) in $max
+    return {
+        "$max": {
+            "$cond": [
+                {"$eq": ["$generation", generation]},
+                {"part_type": "$part_type"},
+                None,
+            ]
+        }
+    }
+
+
+def record_changes(
+    db: pymongo.database.Database,
+    items_collection: str,
+    changes_collection: str,
+    generation: int,
+    previous: int | None,
+) -> dict[str, int]:
+    """Diff a crawl generation against the previous one and store the delta.
+
+    The diff runs entirely inside Mongo: parts are grouped by `PART_KEY` across
+    both generations, and every part that was added, removed or whose part_type
+    changed is merged into the changes collection, tagged with `generation`.
+
+    Args:
+        db: the scraper database.
+        items_collection: the name of the collection with the scraped items.
+        changes_collection: the name of the collection to store the delta in.
+        generation: the generation that just finished.
+        previous: the last complete generation before it, or None for the first
+            crawl (every part is then "added").
+
+    Returns:
+        The number of parts added, removed and changed.
+    """
+    db[items_collection].create_index("generation")
+    db[changes_collection].create_index([("generation", 1), ("_id", 1)])
+
+    generations = [generation] if previous is None else [previous, generation]
+    db[items_collection].aggregate(
+        [
+            {"$match": {"generation": {"$in": generations}}},
+            {
+                "$group": {
+                    "_id": {field: f"${field}" for field in PART_KEY},
+                    "previous": _part_type_in(previous),
+                    "current": _part_type_in(generation),
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    **{field: f"$_id.{field}" for field in PART_KEY},
+                    "generation": {"$literal": generation},
+                    "change": {
+                        "$switch": {
+                            "branches": [
+                                {
+                                    "case": {"$eq": ["$previous", None]},
+                                    "then": "added",
+                                },
+                                {
+                                    "case": {"$eq": ["$current", None]},
+                                    "then": "removed",
+                                },
+                                {
+                                    "case": {
+                                        "$ne": [
+                                            "$previous.part_type",
+                                            "$current.part_type",
+                                        ]
+                                    },
+                                    "then": "changed",
+                                },
+                            ],
+                            "default": None,
+                        }
+                    },
+                    "part_type": {"$ifNull": ["$current.part_type", None]},
+                    "previous_part_type": {"$ifNull": ["$previous.part_type", None]},
+                }
+            },
+            {"$match": {"change": {"$ne": None}}},
+            {"$merge": {"into": changes_collection}},
+        ],
+        allowDiskUse=True,
+    )
+
+    counts = dict.fromkeys(("added", "removed", "changed"), 0)
+    for doc in db[changes_collection].aggregate(
+        [
+            {"$match": {"generation": generation}},
+            {"$group": {"_id": "$change", "count": {"$sum": 1}}},
+        ]
+    ):
+        counts[doc["_id"]] = doc["count"]
+    return counts
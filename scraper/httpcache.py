@@ -0,0 +1,101 @@
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import scrapy
+from loguru import logger
+from scrapy.extensions.httpcache import FilesystemCacheStorage
+from scrapy.http import Response
+from scrapy.settings import BaseSettings
+
+# The last file FilesystemCacheStorage writes for an entry
+LAST_WRITTEN = "request_body"
+
+
+def _entry_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.iterdir() if file.is_file())
+
+
+class BoundedFilesystemCacheStorage(FilesystemCacheStorage):
+    def __init__(self, settings: BaseSettings):
+        """Scrapy's filesystem HTTP cache, with TTL and size-based eviction.
+
+        Entries are keyed by request fingerprint (and gzip-compressed with
+        `HTTPCACHE_GZIP`) exactly like the stock storage. On top of that, expired
+        entries are deleted when the spider opens instead of lingering on disk, and
+        the least recently used entries are evicted once the cache grows past
+        `HTTPCACHE_MAX_SIZE` bytes (0 for no limit). Each entry's directory mtime is
+        touched when it is stored or served, so the eviction order survives restarts
+        (`pickled_meta` keeps the store time, which Scrapy's expiry check reads).
+
+        Args:
+            settings: the crawler settings.
+        """
+        super().__init__(settings)
+        self.max_size = settings.getint("HTTPCACHE_MAX_SIZE")
+        self.entries: OrderedDict[Path, int] = OrderedDict()
+        self.size = 0
+
+    def open_spider(self, spider: scrapy.Spider) -> None:
+        super().open_spider(spider)
+        self.stats = spider.crawler.stats
+
+        now = time.time()
+        found = []
+        for prefix in Path(self.cachedir, spider.name).glob("*"):
+            for entry in prefix.glob("*"):
+                if not (entry / LAST_WRITTEN).exists():
+                    # Partially written entry
+                    shutil.rmtree(entry, ignore_errors=True)
+                    continue
+                stored_at = (entry / "pickled_meta").stat().st_mtime
+                if 0 < self.expiration_secs < now - stored_at:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    self.stats.inc_value("httpcache/expired", spider=spider)
+                    continue
+                found.append((entry.stat().st_mtime, entry, _entry_size(entry)))
+
+        # Least recently used first, so they are the first to be evicted
+        for _, entry, size in sorted(found):
+            self.entries[entry] = size
+            self.size += size
+
+        logger.info(
+            f"HTTP cache holds {len(self.entries)} responses "
+            f"({self.size / 1024 / 1024:.1f} MiB)"
+        )
+        self._evict(spider)
+
+    def retrieve_response(
+        self, spider: scrapy.Spider, request: scrapy.Request
+    ) -> Response | None:
+        response = super().retrieve_response(spider, request)
+        if response is not None:
+            entry = Path(self._get_request_path(spider, request))
+            if entry in self.entries:
+                self.entries.move_to_end(entry)
+                os.utime(entry)
+        return response
+
+    def store_response(
+        self, spider: scrapy.Spider, request: scrapy.Request, response: Response
+    ) -> None:
+        super().store_response(spider, request, response)
+
+        entry = Path(self._get_request_path(spider, request))
+        size = _entry_size(entry)
+        self.size += size - self.entries.get(entry, 0)
+        self.entries[entry] = size
+        self.entries.move_to_end(entry)
+        os.utime(entry)
+        self._evict(spider)
+
+    def _evict(self, spider: scrapy.Spider) -> None:
+        while self.max_size and self.size > self.max_size and self.entries:
+            entry, size = self.entries.popitem(last=False)
+            shutil.rmtree(entry, ignore_errors=True)
+            self.size -= size
+            self.stats.inc_value("httpcache/evicted", spider=spider)
+        self.stats.set_value("httpcache/size_bytes", self.size, spider=spider)
@@ -1,8 +1,10 @@
-import scrapy
+from dataclasses import dataclass
+from typing import ClassVar
 
 
-class ProductItem(scrapy.item.Item):
-    model_config = {
+@dataclass(slots=True)
+class ProductItem:
+    model_config: ClassVar[dict] = {
         "json_schema_extra": {
             "examples": [
                 {
@@ -16,8 +18,8 @@ class ProductItem(scrapy.item.Item):
         }
     }
 
-    make = scrapy.item.Field()
-    category = scrapy.item.Field()
-    model = scrapy.item.Field()
-    part_type = scrapy.item.Field()
-    part_number = scrapy.item.Field()
+    make: str
+    category: str | None
+    model: str
+    part_type: str | None
+    part_number: str
@@ -0,0 +1,91 @@
+import random
+import sys
+import time
+from typing import TextIO
+
+from loguru import logger
+from scrapy.settings import BaseSettings
+
+
+def configure_logging(settings: BaseSettings, sink: TextIO = sys.stderr) -> None:
+    """Switch loguru over to structured, queued output if `LOG_STRUCTURED` is set.
+
+    Records are serialized as JSON lines and handed to a background thread, so the
+    crawl never waits on sink I/O.
+
+    Args:
+        settings: the crawler settings.
+        sink: where to write the records.
+    """
+    if not settings.getbool("LOG_STRUCTURED"):
+        return
+
+    logger.remove()
+    logger.add(
+        sink,
+        level=settings.get("LOG_LEVEL", "DEBUG"),
+        serialize=True,
+        enqueue=True,
+    )
+
+
+class SampledLogger:
+    def __init__(self, sample_rates: dict[str, float], rate_limit: int):
+        """Sampled, rate-limited info logging for the per-page crawl callbacks.
+
+        The sampling decision is made before anything is formatted, and messages
+        use loguru's lazy `{field}` formatting, so a dropped record costs next to
+        nothing. The fields are also attached to the record for structured output.
+
+        Args:
+            sample_rates: the fraction of records to keep per callback (default 1).
+            rate_limit: the maximum records per second per callback (0 for none).
+        """
+        self.sample_rates = sample_rates
+        self.rate_limit = rate_limit
+        self.windows: dict[str, list[float | int]] = {}
+        self.dropped = 0
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> "SampledLogger":
+        return cls(
+            sample_rates=settings.getdict("LOG_SAMPLE_RATES"),
+            rate_limit=settings.getint("LOG_RATE_LIMIT"),
+        )
+
+    def allow(self, callback: str) -> bool:
+        """Decide whether to log a record of this callback.
+
+        Args:
+            callback: the name of the spider callback logging.
+
+        Returns:
+            bool: True if the record should be logged.
+        """
+        rate = self.sample_rates.get(callback, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+
+        if self.rate_limit:
+            now = time.monotonic()
+            window = self.windows.setdefault(callback, [now, 0])
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            if window[1] >= self.rate_limit:
+                return False
+            window[1] += 1
+
+        return True
+
+    def info(self, callback: str, message: str, **fields: object) -> None:
+        """Log an info record, if sampling and rate limits allow it.
+
+        Args:
+            callback: the name of the spider callback logging.
+            message: the message, with `{field}` placeholders.
+            fields: the values of the placeholders.
+        """
+        if not self.allow(callback):
+            self.dropped += 1
+            return
+        logger.opt(depth=1).bind(callback=callback).info(message, **fields)
@@ -1,13 +1,33 @@
 import random
+import shutil
+import sys
+import tempfile
 import time
 from collections.abc import Iterator
+from pathlib import Path
 
 import scrapy
+import scrapy.crawler
 from itemadapter import ItemAdapter
 from loguru import logger
+from scrapy import signals
+from scrapy.settings import BaseSettings
 
 from scraper import items
 from scraper.constants import ALLOWED_DOMAINS, START_URLS
+from scraper.context import CrawlContext
+from scraper.logs import configure_logging, SampledLogger
+
+# Aggregated in place of per-page warnings: stats key -> summary at the end of the crawl
+PAGE_COUNTERS = {
+    "parse/no_categories": "make pages had no categories",
+    "parse/no_models": "category pages had no models",
+    "parse/no_parts": "model pages had no parts",
+    "parse/missing_href": "links had no href",
+    "parse/invalid_items": "parts were missing a required field",
+    "parse/failed_requests": "requests failed",
+    "parse/errors": "pages failed to parse",
+}
 
 
 class ProductsSpider(scrapy.Spider):
@@ -17,17 +37,65 @@ class ProductsSpider(scrapy.Spider):
     start_urls = START_URLS
     allowed_domains = ALLOWED_DOMAINS
 
+    @classmethod
+    def update_settings(cls, settings: BaseSettings) -> None:
+        """Expand the opt-in crawl modes into the Scrapy settings they need.
+
+        Args:
+            settings: the crawler settings, including any command line overrides.
+        """
+        super().update_settings(settings)
+
+        if settings.getbool("LOW_MEMORY_CRAWL"):
+            # The job directory itself is only created once the crawl starts, in
+            # from_crawler
+            settings.set("DUPEFILTER_CLASS", "dupefilters.BloomDupeFilter", "spider")
+
+        if settings.getbool("HTTPCACHE_REPLAY"):
+            # Serve every page from the cache, never expire it and never go online
+            settings.set("HTTPCACHE_ENABLED", True, "spider")
+            settings.set("HTTPCACHE_IGNORE_MISSING", True, "spider")
+            settings.set("HTTPCACHE_EXPIRATION_SECS", 0, "spider")
+
+    @classmethod
+    def from_crawler(
+        cls, crawler: scrapy.crawler.Crawler, *args, **kwargs
+    ) -> "ProductsSpider":
+        configure_logging(crawler.settings)
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.page_log = SampledLogger.from_settings(crawler.settings)
+        settings = crawler.settings
+        if settings.getbool("LOW_MEMORY_CRAWL") and not settings.get("JOBDIR"):
+            # A job directory switches the scheduler over to its disk queues. Only an
+            # explicit JOBDIR resumes a previous crawl: otherwise each run gets a
+            # fresh one, so it doesn't start with every request already seen. The
+            # settings are not frozen yet, and the scheduler has yet to read them
+            parent = settings.get("LOW_MEMORY_JOBDIR")
+            Path(parent).mkdir(parents=True, exist_ok=True)
+            settings.set("JOBDIR", tempfile.mkdtemp(dir=parent), "spider")
+            # Only once the spider state and disk queues have been written out
+            crawler.signals.connect(
+                spider.remove_job_dir, signal=signals.engine_stopped
+            )
+        return spider
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.items_scraped = 0
-        logger.info(f"Starting {self.name} spider")
+        self.page_log = SampledLogger(sample_rates={}, rate_limit=0)
+        logger.info("Starting {name} spider", name=self.name)
 
     def start_requests(self) -> Iterator[scrapy.Request]:
         """Generate initial requests with random delay to be more respectful to the server."""
+        replay = self.settings.getbool("HTTPCACHE_REPLAY")
         for url in self.start_urls:
-            # Add a small random delay before starting
-            time.sleep(random.uniform(1.0, 3.0))
-            yield scrapy.Request(url, callback=self.parse, errback=self.handle_error)
+            # Add a small random delay before starting (no server to be nice to
+            # when replaying from the cache)
+            if not replay:
+                time.sleep(random.uniform(1.0, 3.0))
+            yield scrapy.Request(
+                url, callback=self.parse, errback=self.handle_error, dont_filter=True
+            )
 
     def parse(self, response) -> Iterator[scrapy.Request]:  # noqa: ANN001
         """Initial parsing entrypoint.
@@ -41,14 +109,14 @@ class ProductsSpider(scrapy.Spider):
         Returns:
             An iterator of further scrapy request objects.
         """
-        logger.info(f"Parsing makes from {response.url}")
+        logger.info("Parsing makes from {url}", url=response.url)
         make_count = 0
 
         try:
             make_elements = response.css("div.allmakes li")
 
             if not make_elements:
-                logger.warning(f"No makes found at {response.url}")
+                logger.warning("No makes found at {url}", url=response.url)
                 return
 
             for li in make_elements:
@@ -59,23 +127,23 @@ class ProductsSpider(scrapy.Spider):
                 make = make.strip()
                 make_href = li.css("a::attr(href)").get()
                 if not make_href:
-                    logger.warning(f"No href found for make: {make}")
+                    self.crawler.stats.inc_value("parse/missing_href")
                     continue
 
                 make_count += 1
-                product = {"make": make}
 
                 yield scrapy.Request(
                     response.urljoin(make_href),
                     callback=self.parse_category,
                     errback=self.handle_error,
-                    meta={"product": product, "depth": 1},
+                    meta={"context": CrawlContext.for_make(make), "depth": 1},
                 )
 
-            logger.info(f"Found {make_count} makes to process")
+            logger.info("Found {count} makes to process", count=make_count)
 
         except Exception as e:
-            logger.error(f"Error parsing makes: {str(e)}")
+            self.crawler.stats.inc_value("parse/errors")
+            logger.error("Error parsing makes: {error}", error=str(e))
 
     def parse_category(self, response) -> Iterator[scrapy.Request]:  # noqa: ANN001
         """Second parse step.
@@ -89,16 +157,19 @@ class ProductsSpider(scrapy.Spider):
         Returns:
             An iterator of further scrapy request objects.
         """
-        product = response.meta.get("product", {})
-        logger.info(
-            f"Parsing categories for make: {product.get('make')} from {response.url}"
+        context: CrawlContext = response.meta["context"]
+        self.page_log.info(
+            "parse_category",
+            "Parsing categories for make: {make} from {url}",
+            make=context.make,
+            url=response.url,
         )
 
         try:
             category_elements = response.css("div.allcategories li")
 
             if not category_elements:
-                logger.warning(f"No categories found for make: {product.get('make')}")
+                self.crawler.stats.inc_value("parse/no_categories")
                 return
 
             for li in category_elements:
@@ -110,21 +181,19 @@ class ProductsSpider(scrapy.Spider):
                 category = category.strip().lower()
                 category_href = li.css("a::attr(href)").get()
                 if not category_href:
-                    logger.warning(f"No href found for category: {category}")
+                    self.crawler.stats.inc_value("parse/missing_href")
                     continue
 
-                new_product = dict(product)
-                new_product["category"] = category
-
                 yield scrapy.Request(
                     response.urljoin(category_href),
                     callback=self.parse_model,
                     errback=self.handle_error,
-                    meta={"product": new_product, "depth": 2},
+                    meta={"context": context.with_category(category), "depth": 2},
                 )
 
         except Exception as e:
-            logger.error(f"Error parsing categories: {str(e)}")
+            self.crawler.stats.inc_value("parse/errors")
+            logger.error("Error parsing categories: {error}", error=str(e))
 
     def parse_model(self, response) -> Iterator[scrapy.Request]:  # noqa: ANN001
         """Third parse step.
@@ -138,18 +207,19 @@ class ProductsSpider(scrapy.Spider):
         Returns:
             An iterator of further scrapy request objects.
         """
-        product = response.meta.get("product", {})
-        logger.info(
-            f"Parsing models for make: {product.get('make')}, category: {product.get('category')}"
+        context: CrawlContext = response.meta["context"]
+        self.page_log.info(
+            "parse_model",
+            "Parsing models for make: {make}, category: {category}",
+            make=context.make,
+            category=context.category,
         )
 
         try:
             model_elements = response.css("div.allmodels li")
 
             if not model_elements:
-                logger.warning(
-                    f"No models found for make: {product.get('make')}, category: {product.get('category')}"
-                )
+                self.crawler.stats.inc_value("parse/no_models")
                 return
 
             for li in model_elements:
@@ -160,21 +230,19 @@ class ProductsSpider(scrapy.Spider):
                 model = model.strip()
                 model_href = li.css("a::attr(href)").get()
                 if not model_href:
-                    logger.warning(f"No href found for model: {model}")
+                    self.crawler.stats.inc_value("parse/missing_href")
                     continue
 
-                new_product = dict(product)
-                new_product["model"] = model
-
                 yield scrapy.Request(
                     response.urljoin(model_href),
                     callback=self.parse_part,
                     errback=self.handle_error,
-                    meta={"product": new_product, "depth": 3},
+                    meta={"context": context.with_model(model), "depth": 3},
                 )
 
         except Exception as e:
-            logger.error(f"Error parsing models: {str(e)}")
+            self.crawler.stats.inc_value("parse/errors")
+            logger.error("Error parsing models: {error}", error=str(e))
 
     def parse_part(self, response) -> Iterator[items.ProductItem]:  # noqa: ANN001
         """Fourth parse step.
@@ -188,22 +256,22 @@ class ProductsSpider(scrapy.Spider):
         Returns:
             An iterator of ProductItem objects.
         """
-        product = response.meta.get("product", {})
-        make = product.get("make", "")
-        category = product.get("category", "")
-        model = product.get("model", "")
-
-        logger.info(
-            f"Parsing parts for make: {make}, category: {category}, model: {model}"
+        context: CrawlContext = response.meta["context"]
+        make, category, model = context.make, context.category, context.model
+
+        self.page_log.info(
+            "parse_part",
+            "Parsing parts for make: {make}, category: {category}, model: {model}",
+            make=make,
+            category=category,
+            model=model,
         )
 
         try:
             part_elements = response.css("div.allparts li")
 
             if not part_elements:
-                logger.warning(
-                    f"No parts found for make: {make}, category: {category}, model: {model}"
-                )
+                self.crawler.stats.inc_value("parse/no_parts")
                 return
 
             for li in part_elements:
@@ -216,14 +284,18 @@ class ProductsSpider(scrapy.Spider):
                     part_number = part_number_text.split("-")[0].strip()
                 except (IndexError, AttributeError):
                     logger.warning(
-                        f"Could not parse part number from: {part_number_text}"
+                        "Could not parse part number from: {text}",
+                        text=part_number_text,
                     )
                     part_number = part_number_text.strip()
 
                 # Parse part type, handling potential missing data
                 try:
                     part_type = li.css("a span::text").get()
-                    part_type = part_type.strip().lower() if part_type else None
+                    # Part types come from a small vocabulary, so share the strings
+                    part_type = (
+                        sys.intern(part_type.strip().lower()) if part_type else None
+                    )
                 except AttributeError:
                     part_type = None
 
@@ -239,10 +311,11 @@ class ProductsSpider(scrapy.Spider):
                 # Validate item
                 if self.validate_item(product_item):
                     self.items_scraped += 1
-                    return product_item
+                    yield product_item
 
         except Exception as e:
-            logger.error(f"Error parsing parts: {str(e)}")
+            self.crawler.stats.inc_value("parse/errors")
+            logger.error("Error parsing parts: {error}", error=str(e))
 
     def validate_item(self, item: items.ProductItem) -> bool:
         """Validate required fields in the item.
@@ -258,7 +331,8 @@ class ProductsSpider(scrapy.Spider):
 
         for field in required_fields:
             if not adapter.get(field):
-                logger.warning(f"Missing required field {field} in item")
+                self.crawler.stats.inc_value("parse/invalid_items")
+                self.crawler.stats.inc_value(f"parse/invalid_items/{field}")
                 return False
         return True
 
@@ -269,7 +343,10 @@ class ProductsSpider(scrapy.Spider):
             failure: The failure information.
         """
         request = failure.request
-        logger.error(f"Request failed: {request.url}, error: {repr(failure)}")
+        self.crawler.stats.inc_value("parse/failed_requests")
+        logger.error(
+            "Request failed: {url}, error: {error!r}", url=request.url, error=failure
+        )
 
     def closed(self, reason: str) -> None:
         """Called when the spider is closed.
@@ -277,6 +354,29 @@ class ProductsSpider(scrapy.Spider):
         Args:
             reason: The reason for closing.
         """
+        stats = self.crawler.stats
+        for key, description in PAGE_COUNTERS.items():
+            if count := stats.get_value(key):
+                logger.warning(
+                    "{count} {description}", count=count, description=description
+                )
+        if self.page_log.dropped:
+            stats.set_value("log/dropped", self.page_log.dropped)
+
         logger.info(
-            f"Spider closed: {reason}. Total items scraped: {self.items_scraped}"
+            "Spider closed: {reason}. Total items scraped: {count}",
+            reason=reason,
+            count=self.items_scraped,
         )
+        # Flush the queued sink, if structured logging is on
+        logger.complete()
+
+    def remove_job_dir(self) -> None:
+        """Delete this run's job directory, unless the crawl needs resuming."""
+        job_dir = self.settings.get("JOBDIR")
+        if self.crawler.stats.get_value("finish_reason") == "finished":
+            shutil.rmtree(job_dir, ignore_errors=True)
+        else:
+            logger.warning(
+                "Crawl interrupted, resume it with -s JOBDIR={job_dir}", job_dir=job_dir
+            )
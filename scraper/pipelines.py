@@ -1,54 +1,274 @@
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+
 import pymongo
 import scrapy.crawler
 from itemadapter import ItemAdapter
+from loguru import logger
+from scrapy import signals
 from scrapy.statscollectors import StatsCollector
+from twisted.internet import task
 
 from scraper import items
+from scraper.generations import new_generation, record_changes
+from scraper.snapshots import write_snapshot
+from scraper.spool import SpoolDrainer, SpoolWriter
+
+# Non-zero stats meaning some pages were never parsed, so the crawl is not a full
+# picture of the catalogue
+INCOMPLETE_CRAWL_STATS = (
+    "httpcache/ignore",
+    "downloader/exception_count",
+    "httperror/response_ignored_count",
+    "spider_exceptions/",
+    "log_count/ERROR",
+    "parse/failed_requests",
+    "parse/errors",
+    "dupefilter/bloom/expected_false_positives",
+)
 
 
 class MongoPipeline:
-    def __init__(self, uri: str, db: str, collection: str, stats: StatsCollector):
+    def __init__(
+        self,
+        uri: str,
+        db: str,
+        collection: str,
+        stats: StatsCollector,
+        spool_dir: str | None = None,
+        spool_segment_items: int = 1000,
+        spool_segment_seconds: float = 5.0,
+        spool_batch_size: int = 500,
+        spool_retry_interval: float = 5.0,
+        spool_close_timeout: float = 60.0,
+        snapshot_path: str | None = None,
+        snapshot_batch_size: int = 50_000,
+        replay: bool = False,
+    ):
         """Pipeline step for saving spider results into MongoDB.
 
         Simply dump any new crawl data into a predefined Mongo collection. Also save
         the end of run stats to a separate collection.
 
+        Every item is tagged with the crawl's generation ID. When a crawl finishes,
+        the parts added, removed or changed since the previous complete generation
+        are stored in the changes collection, for clients syncing only the delta,
+        and the generation is exported as a columnar snapshot for bulk readers.
+
+        With a spool directory, items are appended to a local write-ahead spool
+        instead, and a background drainer bulk-loads it into Mongo. A slow or
+        restarting Mongo then no longer stalls the crawl, and whatever is still
+        spooled when the crawl ends is loaded by the next run.
+
         Args:
             uri: the address of the database server (in URI format).
             db: the name of the database.
             collection: the name of the collection.
             stats: use this Scrapy object to fetch the end of run stats.
+            spool_dir: the spool directory, or None to insert items directly.
+            spool_segment_items: the number of items per spool segment.
+            spool_segment_seconds: the age after which a spool segment is loaded.
+            spool_batch_size: the number of items per bulk insert.
+            spool_retry_interval: the seconds to wait after Mongo fails.
+            spool_close_timeout: the seconds to keep loading the spool at the end.
+            snapshot_path: where to write the Parquet snapshot, or None to skip it.
+            snapshot_batch_size: the number of items per snapshot row group.
+            replay: whether the crawl is replayed from the HTTP cache.
         """
         self.mongo_uri = uri
         self.mongo_db = db
         self.collection_name = collection
         self.stats_collection_name = "stats"
+        self.changes_collection_name = "changes"
+        self.generations_collection_name = "generations"
         self.stats = stats
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.spool_segment_items = spool_segment_items
+        self.spool_segment_seconds = spool_segment_seconds
+        self.spool_batch_size = spool_batch_size
+        self.spool_retry_interval = spool_retry_interval
+        self.spool_close_timeout = spool_close_timeout
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_batch_size = snapshot_batch_size
+        self.replay = replay
+        self.spool: SpoolWriter | None = None
+        self.drainer: SpoolDrainer | None = None
+        self.spool_timer: task.LoopingCall | None = None
+        self.generation = new_generation()
+        self.started_at = datetime.now(UTC)
+        self.drained = False
 
     @classmethod
     def from_crawler(cls, crawler: scrapy.crawler.Crawler) -> "MongoPipeline":
-        return cls(
+        pipeline = cls(
             uri=crawler.settings.get("MONGODB_SERVER"),
             db=crawler.settings.get("MONGODB_DB"),
             collection=crawler.settings.get("MONGODB_COLLECTION"),
             stats=crawler.stats,
+            spool_dir=crawler.settings.get("MONGODB_SPOOL_DIR"),
+            spool_segment_items=crawler.settings.getint(
+                "MONGODB_SPOOL_SEGMENT_ITEMS", 1000
+            ),
+            spool_segment_seconds=crawler.settings.getfloat(
+                "MONGODB_SPOOL_SEGMENT_SECONDS", 5.0
+            ),
+            spool_batch_size=crawler.settings.getint("MONGODB_SPOOL_BATCH_SIZE", 500),
+            spool_retry_interval=crawler.settings.getfloat(
+                "MONGODB_SPOOL_RETRY_INTERVAL", 5.0
+            ),
+            spool_close_timeout=crawler.settings.getfloat(
+                "MONGODB_SPOOL_CLOSE_TIMEOUT", 60.0
+            ),
+            snapshot_path=crawler.settings.get("SNAPSHOT_PATH"),
+            snapshot_batch_size=crawler.settings.getint("SNAPSHOT_BATCH_SIZE", 50_000),
+            replay=crawler.settings.getbool("HTTPCACHE_REPLAY"),
         )
+        # Runs after close_spider, once the crawl's finish reason is known
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
 
     def open_spider(self, _: scrapy.Spider) -> None:
         self.client = pymongo.MongoClient(self.mongo_uri)
         self.db = self.client[self.mongo_db]
+        self.stats.set_value("generation", self.generation)
+        logger.info(f"Crawling generation {self.generation}")
+
+        if self.spool_dir:
+            self.spool = SpoolWriter(
+                self.spool_dir, self.spool_segment_items, self.spool_segment_seconds
+            )
+            self.drainer = SpoolDrainer(
+                self.spool_dir,
+                self.db[self.collection_name],
+                self.stats,
+                self.spool_batch_size,
+                self.spool_retry_interval,
+            )
+            # Also picks up segments left over by a previous run
+            self.drainer.start()
+            # Seal segments by age even when no new items come in
+            self.spool_timer = task.LoopingCall(self.seal_stale_segment)
+            self.spool_timer.start(min(1.0, self.spool_segment_seconds), now=False)
+
+    def seal_stale_segment(self) -> None:
+        if self.spool.seal_if_stale():
+            self.drainer.notify()
 
     def close_spider(self, _: scrapy.Spider) -> None:
+        if self.spool:
+            self.spool_timer.stop()
+            self.spool.seal()
+            self.drained = self.drainer.stop(self.spool_close_timeout)
+        else:
+            self.drained = True
+
         # Save the stats of the crawl at the end of the run
-        self.db[self.stats_collection_name].insert_one(self.stats.get_stats())
-        self.client.close()
+        try:
+            self.db[self.stats_collection_name].insert_one(self.stats.get_stats())
+        except pymongo.errors.PyMongoError as e:
+            logger.error(f"Could not save crawl stats: {str(e)}")
+
+    def spider_closed(self, spider: scrapy.Spider, reason: str) -> None:
+        """Record the crawl's generation, its changes and snapshot, if it is complete.
+
+        A crawl that was cut short, lost pages along the way, or whose items are not
+        all in Mongo yet, would report every part it missed as removed. It is left
+        out of the change feed and snapshot, and the next crawl is diffed against the
+        last complete generation instead. So are replays from the HTTP cache, which
+        only cover the pages that happen to be cached.
+
+        Args:
+            spider: unused (signal handlers receive their arguments by name).
+            reason: the reason the spider closed.
+        """
+        try:
+            incomplete = self.incomplete_reason(reason)
+            if incomplete:
+                logger.warning(
+                    f"Generation {self.generation} is incomplete ({incomplete}), "
+                    "not recording its changes"
+                )
+                return
+
+            generations = self.db[self.generations_collection_name]
+            previous = generations.find_one({}, sort=[("_id", pymongo.DESCENDING)])
+            previous_id = previous["_id"] if previous else None
+            counts = record_changes(
+                self.db,
+                self.collection_name,
+                self.changes_collection_name,
+                self.generation,
+                previous_id,
+            )
+            generations.insert_one(
+                {
+                    "_id": self.generation,
+                    "previous": previous_id,
+                    "started_at": self.started_at,
+                    "finished_at": datetime.now(UTC),
+                    **counts,
+                }
+            )
+            logger.info(
+                f"Generation {self.generation} vs {previous_id}: "
+                f"{counts['added']} added, {counts['removed']} removed, "
+                f"{counts['changed']} changed"
+            )
+
+            if self.snapshot_path:
+                self.export_snapshot()
+        except pymongo.errors.PyMongoError as e:
+            logger.error(f"Could not record generation {self.generation}: {str(e)}")
+        finally:
+            self.client.close()
+
+    def incomplete_reason(self, reason: str) -> str | None:
+        """Tell why the crawl can't be recorded as a generation, if it can't.
+
+        Args:
+            reason: the reason the spider closed.
+
+        Returns:
+            The reason the crawl is incomplete, or None if it is complete.
+        """
+        if self.replay:
+            return "replayed from the HTTP cache"
+        if reason != "finished":
+            return reason
+        if not self.drained:
+            return "items left in the spool"
+
+        lost = [
+            f"{key}={value}"
+            for key, value in self.stats.get_stats().items()
+            if key.startswith(INCOMPLETE_CRAWL_STATS) and value
+        ]
+        return ", ".join(lost) or None
+
+    def export_snapshot(self) -> None:
+        """Write the crawl's items to the columnar snapshot file."""
+        started = time.perf_counter()
+        rows = write_snapshot(
+            self.db[self.collection_name],
+            self.snapshot_path,
+            self.generation,
+            self.snapshot_batch_size,
+        )
+        size = self.snapshot_path.stat().st_size
+        self.stats.set_value("snapshot/rows", rows)
+        self.stats.set_value("snapshot/bytes", size)
+        logger.info(
+            f"Wrote snapshot of {rows} items ({size / 1024 / 1024:.1f} MiB) to "
+            f"{self.snapshot_path} in {time.perf_counter() - started:.1f}s"
+        )
 
     def process_item(
         self, item: items.ProductItem, _: scrapy.crawler.Crawler
     ) -> items.ProductItem:
         """This is the entry point into this pipeline step, after the spider
         discovers a new data point. We intercept it in this method and send it to the
-        database.
+        database (or to the spool, if enabled).
 
         Args:
             item: the crawled data item.
@@ -57,5 +277,13 @@ class MongoPipeline:
         Returns:
             Bounces back the crawled data dictionary.
         """
-        self.db[self.collection_name].insert_one(ItemAdapter(item).asdict())
+        doc = ItemAdapter(item).asdict()
+        doc["generation"] = self.generation
+
+        if self.spool:
+            if self.spool.append(doc):
+                self.drainer.notify()
+            self.stats.inc_value("spool/items_spooled")
+        else:
+            self.db[self.collection_name].insert_one(doc)
         return item
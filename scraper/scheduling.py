@@ -0,0 +1,153 @@
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime, UTC
+from typing import Any
+
+import pymongo
+import scrapy
+import scrapy.crawler
+from loguru import logger
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+MAKE_ORDERS = ("stalest", "smallest", "largest")
+
+
+class CrawlPriorityMiddleware:
+    def __init__(
+        self,
+        depth_step: int,
+        make_order: str,
+        uri: str,
+        db: str,
+        collection: str,
+    ):
+        """Spider middleware that orders the make requests by previous crawls.
+
+        The crawl itself goes depth-first through Scrapy's own `DEPTH_PRIORITY`.
+        On top of that, the make requests are ordered by what the previous crawls
+        left in Mongo: "stalest" first (oldest last write), or "smallest"/"largest"
+        first (part count). Makes not in Mongo yet count as stalest and smallest.
+
+        Args:
+            depth_step: the priority per level of depth (the absolute value of
+                `DEPTH_PRIORITY`), which the make bonus is kept below.
+            make_order: one of `MAKE_ORDERS`.
+            uri: the address of the database server (in URI format).
+            db: the name of the database.
+            collection: the name of the collection with the scraped items.
+        """
+        self.depth_step = depth_step
+        self.make_order = make_order
+        self.mongo_uri = uri
+        self.mongo_db = db
+        self.collection_name = collection
+        self.make_stats: dict[str, dict[str, Any]] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler: scrapy.crawler.Crawler) -> "CrawlPriorityMiddleware":
+        make_order = crawler.settings.get("CRAWL_MAKE_ORDER")
+        if not make_order:
+            raise NotConfigured("CRAWL_MAKE_ORDER is not set")
+        if make_order not in MAKE_ORDERS:
+            raise ValueError(
+                f"CRAWL_MAKE_ORDER must be one of {MAKE_ORDERS}, got {make_order!r}"
+            )
+
+        middleware = cls(
+            depth_step=abs(crawler.settings.getint("DEPTH_PRIORITY")),
+            make_order=make_order,
+            uri=crawler.settings.get("MONGODB_SERVER"),
+            db=crawler.settings.get("MONGODB_DB"),
+            collection=crawler.settings.get("MONGODB_COLLECTION"),
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        return middleware
+
+    def spider_opened(self, spider: scrapy.Spider) -> None:
+        """Load the per-make part count and last write time of previous crawls.
+
+        Args:
+            spider: unused (signal handlers receive their arguments by name).
+        """
+        try:
+            with pymongo.MongoClient(
+                self.mongo_uri, serverSelectionTimeoutMS=2000
+            ) as client:
+                cursor = client[self.mongo_db][self.collection_name].aggregate(
+                    [
+                        {
+                            "$group": {
+                                "_id": "$make",
+                                "count": {"$sum": 1},
+                                "last_id": {"$max": "$_id"},
+                            }
+                        }
+                    ],
+                    allowDiskUse=True,
+                )
+                self.make_stats = {
+                    doc["_id"]: {
+                        "count": doc["count"],
+                        # ObjectIds embed their insertion time
+                        "last_seen": doc["last_id"].generation_time,
+                    }
+                    for doc in cursor
+                }
+        except pymongo.errors.PyMongoError as e:
+            logger.warning(f"Could not load make stats, keeping page order: {str(e)}")
+
+        logger.info(
+            f"Ordering makes by {self.make_order}, "
+            f"{len(self.make_stats)} makes known from previous crawls"
+        )
+
+    def _make_sort_key(self, request: scrapy.Request) -> Any:  # noqa: ANN401
+        stats = self.make_stats.get(request.meta["context"].make)
+        if self.make_order == "stalest":
+            never_seen = datetime.min.replace(tzinfo=UTC)
+            return stats["last_seen"] if stats else never_seen
+        count = stats["count"] if stats else 0
+        return count if self.make_order == "smallest" else -count
+
+    @staticmethod
+    def _is_make_request(obj: Any) -> bool:  # noqa: ANN401
+        return isinstance(obj, scrapy.Request) and obj.meta.get("depth") == 1
+
+    def _order_makes(self, make_requests: list[scrapy.Request]) -> list[scrapy.Request]:
+        # Earlier makes get a higher bonus, kept below the next depth level
+        make_requests.sort(key=self._make_sort_key)
+        for index, request in enumerate(make_requests):
+            bonus = len(make_requests) - index
+            if self.depth_step:
+                bonus = min(bonus, self.depth_step - 1)
+            request.priority += bonus
+        return make_requests
+
+    def process_spider_output(
+        self,
+        response: scrapy.http.Response,
+        result: Iterable[Any],
+        spider: scrapy.Spider,
+    ) -> Iterator[Any]:
+        make_requests = []
+        for obj in result:
+            if self._is_make_request(obj):
+                make_requests.append(obj)
+            else:
+                yield obj
+        yield from self._order_makes(make_requests)
+
+    async def process_spider_output_async(
+        self,
+        response: scrapy.http.Response,
+        result: AsyncIterator[Any],
+        spider: scrapy.Spider,
+    ) -> AsyncIterator[Any]:
+        make_requests = []
+        async for obj in result:
+            if self._is_make_request(obj):
+                make_requests.append(obj)
+            else:
+                yield obj
+        for request in self._order_makes(make_requests):
+            yield request
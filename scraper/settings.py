@@ -2,8 +2,63 @@ ITEM_PIPELINES = {
     "pipelines.MongoPipeline": 1,
 }
 
+SPIDER_MIDDLEWARES = {
+    "scheduling.CrawlPriorityMiddleware": 800,
+}
+
 MONGODB_SERVER = "mongodb://localhost:27017"
 MONGODB_PORT = 27017
 MONGODB_DB = "scraping_db"
 MONGODB_COLLECTION = "scraped_items"
 CONCURRENT_REQUESTS = 10
+
+# The spool, job and cache directories default to /data, which the Dockerfile creates
+# for the non-privileged user (point them elsewhere to run outside the container)
+
+# Low-memory crawl: keep the scheduler queue on disk (in the job directory) and
+# dedupe requests with a fixed-size Bloom filter instead of an in-memory set. Unless
+# JOBDIR is set to resume a crawl, each run gets a fresh job directory under
+# LOW_MEMORY_JOBDIR, deleted once the crawl has finished
+LOW_MEMORY_CRAWL = False
+LOW_MEMORY_JOBDIR = "/data/crawls/products-scraper"
+DUPEFILTER_BLOOM_CAPACITY = 2_000_000
+DUPEFILTER_BLOOM_ERROR_RATE = 0.0001
+
+# Depth-first scheduling: Scrapy adds -DEPTH_PRIORITY per level of depth to each
+# request's priority (0 crawls level by level). Makes can also be ordered by
+# "stalest", "smallest" or "largest" from previous crawls
+DEPTH_PRIORITY = -100
+CRAWL_MAKE_ORDER = None
+
+# Write-ahead spool: items are appended to local compressed segments and loaded into
+# Mongo in the background, so a slow or restarting Mongo doesn't stall the crawl
+# (set MONGODB_SPOOL_DIR to None to insert items directly)
+MONGODB_SPOOL_DIR = "/data/spool"
+MONGODB_SPOOL_SEGMENT_ITEMS = 1000
+MONGODB_SPOOL_SEGMENT_SECONDS = 5.0
+MONGODB_SPOOL_BATCH_SIZE = 500
+MONGODB_SPOOL_RETRY_INTERVAL = 5.0
+MONGODB_SPOOL_CLOSE_TIMEOUT = 60.0
+
+# Response cache (opt-in): gzip-compressed, keyed by request fingerprint, with a TTL
+# and a size limit (LRU eviction). HTTPCACHE_REPLAY crawls from the cache only,
+# without any network access
+HTTPCACHE_ENABLED = False
+HTTPCACHE_DIR = "/data/httpcache"
+HTTPCACHE_GZIP = True
+HTTPCACHE_EXPIRATION_SECS = 7 * 24 * 60 * 60
+HTTPCACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+HTTPCACHE_STORAGE = "httpcache.BoundedFilesystemCacheStorage"
+HTTPCACHE_REPLAY = False
+
+# Columnar snapshot: after each complete crawl, export its items to a compressed,
+# dictionary-encoded Parquet file (served by the API at /scrape/snapshot)
+SNAPSHOT_PATH = "snapshots/catalogue.parquet"
+SNAPSHOT_BATCH_SIZE = 50_000
+
+# Logging: LOG_STRUCTURED emits JSON lines through a queued (asynchronous) sink, and
+# the per-page info logs can be sampled per callback (e.g. {"parse_part": 0.01}) and
+# rate limited (records per second per callback, 0 for no limit)
+LOG_STRUCTURED = False
+LOG_SAMPLE_RATES = {}
+LOG_RATE_LIMIT = 0
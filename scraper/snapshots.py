@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pymongo.collection
+
+# Low-cardinality columns are dictionary-encoded in memory as well as on disk
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("make", pa.dictionary(pa.int32(), pa.string())),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("model", pa.dictionary(pa.int32(), pa.string())),
+        ("part_type", pa.dictionary(pa.int32(), pa.string())),
+        ("part_number", pa.string()),
+    ]
+)
+
+
+def write_snapshot(
+    collection: pymongo.collection.Collection,
+    path: Path,
+    generation: int,
+    batch_size: int,
+) -> int:
+    """Export one crawl generation as a compressed Parquet file.
+
+    Items are streamed from Mongo and written one row group per `batch_size` items,
+    so memory stays bounded whatever the size of the catalogue. The file is written
+    next to `path` and renamed over it at the end, so readers never see a partial
+    snapshot.
+
+    Args:
+        collection: the collection with the scraped items.
+        path: where to write the snapshot.
+        generation: the crawl generation to export.
+        batch_size: the number of items per row group.
+
+    Returns:
+        The number of items written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    columns = SNAPSHOT_SCHEMA.names
+    rows = 0
+
+    cursor = collection.find(
+        {"generation": generation},
+        projection={"_id": 0, **dict.fromkeys(columns, 1)},
+        batch_size=batch_size,
+    )
+    with pq.ParquetWriter(tmp, SNAPSHOT_SCHEMA, compression="zstd") as writer:
+        batch = {column: [] for column in columns}
+        for doc in cursor:
+            for column in columns:
+                batch[column].append(doc.get(column))
+            rows += 1
+            if rows % batch_size == 0:
+                writer.write_table(pa.table(batch, schema=SNAPSHOT_SCHEMA))
+                batch = {column: [] for column in columns}
+        if rows % batch_size:
+            writer.write_table(pa.table(batch, schema=SNAPSHOT_SCHEMA))
+
+    os.replace(tmp, path)
+    return rows
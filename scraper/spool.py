@@ -0,0 +1,290 @@
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+import pymongo
+import pymongo.collection
+from bson import ObjectId
+from loguru import logger
+from scrapy.statscollectors import StatsCollector
+
+SEGMENT_GLOB = "segment-*.ndjson.gz"
+ACTIVE_SUFFIX = ".active"
+CHECKPOINT_SUFFIX = ".ckpt"
+DUPLICATE_KEY_ERROR = 11000
+
+
+def sealed_segments(path: Path) -> list[Path]:
+    """List the sealed segments of a spool directory, oldest first."""
+    return sorted(path.glob(SEGMENT_GLOB))
+
+
+def segment_sequence(segment: Path) -> int:
+    return int(segment.name.split(".")[0].removeprefix("segment-"))
+
+
+def spooled_id(generation: int, sequence: int, offset: int) -> ObjectId:
+    """Deterministic `_id` of a spooled item, so reloading a batch is idempotent.
+
+    Generation IDs are Unix timestamps, so the ID is a regular ObjectId created at
+    the start of the crawl, followed by the item's segment and line.
+
+    Args:
+        generation: the generation of the crawl the item belongs to.
+        sequence: the sequence number of the item's segment.
+        offset: the item's line in the segment.
+
+    Returns:
+        The item's ObjectId.
+    """
+    return ObjectId(
+        generation.to_bytes(4, "big")
+        + sequence.to_bytes(4, "big")
+        + offset.to_bytes(4, "big")
+    )
+
+
+class SpoolWriter:
+    def __init__(self, path: Path, segment_items: int, segment_seconds: float):
+        """Append-only, segmented write-ahead log of crawled items.
+
+        Items are appended as gzip-compressed NDJSON to the active segment, which is
+        flushed after every item so a crash loses nothing that was appended. The
+        segment is sealed (renamed to its final name) once it holds `segment_items`
+        items or is `segment_seconds` old, and only sealed segments are loaded.
+
+        Args:
+            path: the spool directory.
+            segment_items: the number of items after which a segment is sealed.
+            segment_seconds: the age after which a segment is sealed.
+        """
+        self.path = path
+        self.segment_items = segment_items
+        self.segment_seconds = segment_seconds
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # Recover the segment a crashed run was still writing to
+        for active in self.path.glob(SEGMENT_GLOB + ACTIVE_SUFFIX):
+            logger.warning(f"Sealing segment left over by a previous run: {active}")
+            active.rename(active.with_suffix(""))
+
+        segments = sealed_segments(self.path)
+        self.sequence = segment_sequence(segments[-1]) if segments else 0
+        self.file: gzip.GzipFile | None = None
+        self.file_path: Path | None = None
+        self.items = 0
+        self.opened_at = 0.0
+
+    def append(self, doc: dict) -> bool:
+        """Append one item to the active segment.
+
+        Args:
+            doc: the item to spool, as a JSON-serializable dictionary.
+
+        Returns:
+            bool: True if this sealed the active segment.
+        """
+        if self.file is None:
+            self.sequence += 1
+            name = f"segment-{self.sequence:08d}.ndjson.gz{ACTIVE_SUFFIX}"
+            self.file_path = self.path / name
+            self.file = gzip.open(self.file_path, "wb")
+            self.items = 0
+            self.opened_at = time.monotonic()
+
+        self.file.write(json.dumps(doc, separators=(",", ":")).encode() + b"\n")
+        # Sync flush keeps the compression window but makes the bytes recoverable
+        self.file.flush(zlib.Z_SYNC_FLUSH)
+        self.items += 1
+
+        if self.items >= self.segment_items:
+            self.seal()
+            return True
+        return self.seal_if_stale()
+
+    def seal_if_stale(self) -> bool:
+        """Seal the active segment if it is `segment_seconds` old.
+
+        Also called from a timer, so items spooled before a quiet period are loaded
+        without waiting for the next item.
+
+        Returns:
+            bool: True if this sealed the active segment.
+        """
+        if (
+            self.file is None
+            or time.monotonic() - self.opened_at < self.segment_seconds
+        ):
+            return False
+        self.seal()
+        return True
+
+    def seal(self) -> None:
+        """Close the active segment and hand it over to the drainer."""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file_path.rename(self.file_path.with_suffix(""))
+        self.file = None
+        self.file_path = None
+
+
+def read_segment(path: Path, skip: int = 0) -> Iterator[dict]:
+    """Read the items of a segment.
+
+    Args:
+        path: the segment file.
+        skip: the number of items already loaded (from its checkpoint).
+
+    Returns:
+        An iterator of the items after the first `skip` ones.
+    """
+    with gzip.open(path, "rb") as file:
+        try:
+            for index, line in enumerate(file):
+                if index < skip:
+                    continue
+                if not line.endswith(b"\n"):
+                    logger.warning(f"Dropping truncated last item of {path}")
+                    return
+                yield json.loads(line)
+        except EOFError:
+            # Segments recovered from a crash have no gzip trailer
+            logger.warning(f"Segment {path} ended without a trailer")
+
+
+class SpoolDrainer(threading.Thread):
+    def __init__(
+        self,
+        path: Path,
+        collection: pymongo.collection.Collection,
+        stats: StatsCollector,
+        batch_size: int,
+        retry_interval: float,
+    ):
+        """Background thread bulk-loading sealed spool segments into Mongo.
+
+        Segments are loaded oldest first, in batches. The number of items already
+        loaded is checkpointed after every batch and the segment is deleted once it
+        is fully loaded, so a restart resumes where the previous run stopped. While
+        Mongo is unavailable the drainer waits and retries, and the crawl keeps
+        spooling to disk. Every item gets a deterministic `_id`, so a batch that
+        Mongo committed before the error reached the drainer is not loaded twice.
+
+        Args:
+            path: the spool directory.
+            collection: the collection to load the items into.
+            stats: the crawl stats, to record the spool's progress in.
+            batch_size: the number of items per `insert_many`.
+            retry_interval: the seconds to wait after Mongo fails, or while idle.
+        """
+        super().__init__(name="spool-drainer", daemon=True)
+        self.path = path
+        self.collection = collection
+        self.stats = stats
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.wakeup = threading.Event()
+        self.closing = threading.Event()
+        self.aborted = threading.Event()
+
+    def notify(self) -> None:
+        """Signal that a new segment was sealed."""
+        self.wakeup.set()
+
+    def stop(self, timeout: float) -> bool:
+        """Drain what is left on disk, then stop.
+
+        Args:
+            timeout: the seconds to keep draining before giving up.
+
+        Returns:
+            bool: True if every segment was loaded, False if some are left on disk.
+        """
+        self.closing.set()
+        self.wakeup.set()
+        self.join(timeout)
+        if self.is_alive():
+            self.aborted.set()
+            self.join()
+
+        pending = len(sealed_segments(self.path))
+        self.stats.set_value("spool/segments_pending", pending)
+        if pending:
+            logger.warning(
+                f"{pending} spool segments left in {self.path}, "
+                "they will be loaded by the next run"
+            )
+        return not pending
+
+    def run(self) -> None:
+        while not self.aborted.is_set():
+            # Segments sealed before closing are all picked up by this pass
+            closing = self.closing.is_set()
+            try:
+                self.drain()
+            except pymongo.errors.PyMongoError as e:
+                self.stats.inc_value("spool/load_errors")
+                logger.warning(f"Could not load spool into Mongo: {str(e)}")
+            if closing:
+                return
+
+            self.wakeup.wait(self.retry_interval)
+            self.wakeup.clear()
+
+    def drain(self) -> None:
+        """Load every sealed segment currently on disk."""
+        for segment in sealed_segments(self.path):
+            if self.aborted.is_set():
+                return
+            self.load_segment(segment)
+
+    def load_segment(self, segment: Path) -> None:
+        """Load one segment in batches, checkpointing after each, then delete it.
+
+        Args:
+            segment: the sealed segment file.
+        """
+        checkpoint = segment.with_name(segment.name + CHECKPOINT_SUFFIX)
+        loaded = int(checkpoint.read_text()) if checkpoint.exists() else 0
+        sequence = segment_sequence(segment)
+
+        batch = []
+        for offset, doc in enumerate(read_segment(segment, skip=loaded), loaded):
+            doc["_id"] = spooled_id(doc["generation"], sequence, offset)
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                loaded = self._load_batch(batch, checkpoint, loaded)
+                batch = []
+                if self.aborted.is_set():
+                    return
+        if batch:
+            self._load_batch(batch, checkpoint, loaded)
+
+        segment.unlink()
+        checkpoint.unlink(missing_ok=True)
+        self.stats.inc_value("spool/segments_loaded")
+
+    def _load_batch(self, batch: list[dict], checkpoint: Path, loaded: int) -> int:
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            inserted = len(batch)
+        except pymongo.errors.BulkWriteError as e:
+            # Items already inserted by an earlier attempt at this batch
+            errors = e.details["writeErrors"]
+            if any(error["code"] != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            inserted = e.details["nInserted"]
+            self.stats.inc_value("spool/items_duplicate", len(errors))
+
+        loaded += len(batch)
+        tmp = checkpoint.with_name(checkpoint.name + ".tmp")
+        tmp.write_text(str(loaded))
+        os.replace(tmp, checkpoint)
+        self.stats.inc_value("spool/items_loaded", inserted)
+        return loaded
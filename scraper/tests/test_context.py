@@ -0,0 +1,40 @@
+import dataclasses
+import pickle
+
+import pytest
+
+from scraper.context import CrawlContext
+
+
+class TestCrawlContext:
+    """Tests for the crawl context passed through request meta."""
+
+    def test_derives_child_contexts(self):
+        """Test each step keeps its parent's fields and adds its own."""
+        make = CrawlContext.for_make("Volvo")
+        category = make.with_category("engine")
+        model = category.with_model("EC210")
+
+        assert make == CrawlContext(make="Volvo")
+        assert category == CrawlContext(make="Volvo", category="engine")
+        assert model == CrawlContext(make="Volvo", category="engine", model="EC210")
+
+    def test_interns_strings(self):
+        """Test equal values from different pages share one string object."""
+        first = CrawlContext.for_make("".join(["Vol", "vo"]))
+        second = CrawlContext.for_make("".join(["Vo", "lvo"]))
+
+        assert first.make is second.make
+
+    def test_is_immutable(self):
+        """Test the context cannot be changed once queued."""
+        context = CrawlContext.for_make("Volvo")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            context.make = "Other"
+
+    def test_pickles(self):
+        """Test the context survives a round trip through a disk queue."""
+        context = CrawlContext.for_make("Volvo").with_category("engine")
+
+        assert pickle.loads(pickle.dumps(context)) == context  # noqa: S301
@@ -0,0 +1,120 @@
+import hashlib
+from unittest.mock import MagicMock
+
+from scrapy.crawler import Crawler
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from scraper.dupefilters import BloomDupeFilter, BloomFilter
+from scraper.main import ProductsSpider
+
+
+def fingerprint(value: int) -> bytes:
+    return hashlib.sha1(str(value).encode()).digest()  # noqa: S324
+
+
+class TestBloomFilter:
+    """Tests for the fixed-size fingerprint set."""
+
+    def test_sizing(self):
+        """Test the bit array and hash count follow the capacity and error rate."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+        assert bloom.size == 9586
+        assert bloom.hash_count == 7
+        assert len(bloom.bits) == 1199
+
+    def test_add(self):
+        """Test a key is only reported as seen the second time."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+        assert bloom.add(fingerprint(1)) is False
+        assert bloom.add(fingerprint(1)) is True
+        assert bloom.count == 1
+
+    def test_error_rate_within_budget(self):
+        """Test the false positive rate at capacity stays close to the budget."""
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for value in range(10_000):
+            bloom.add(fingerprint(value))
+
+        false_positives = sum(
+            fingerprint(value) in bloom for value in range(10_000, 20_000)
+        )
+
+        assert false_positives < 200
+        assert 0.005 < bloom.estimated_error_rate < 0.02
+
+    def test_load(self):
+        """Test a saved filter remembers its keys and roughly how many."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for value in range(500):
+            bloom.add(fingerprint(value))
+
+        restored = BloomFilter(capacity=1000, error_rate=0.01)
+        restored.load(bytes(bloom.bits))
+
+        assert fingerprint(42) in restored
+        assert 450 < restored.count < 550
+
+
+class TestBloomDupeFilter:
+    """Tests for the Scrapy dupefilter backed by the Bloom filter."""
+
+    def test_request_seen(self):
+        """Test duplicate requests are detected through their fingerprint."""
+        fingerprinter = MagicMock()
+        fingerprinter.fingerprint.side_effect = lambda request: fingerprint(request)
+        dupefilter = BloomDupeFilter(
+            capacity=1000,
+            error_rate=0.01,
+            stats=MagicMock(),
+            fingerprinter=fingerprinter,
+        )
+
+        assert dupefilter.request_seen(1) is False
+        assert dupefilter.request_seen(1) is True
+
+    def test_new_crawl_starts_empty(self, tmp_path):
+        """Test a new crawl gets a fresh filter, and a resumed one keeps its state."""
+        fingerprinter = MagicMock()
+        fingerprinter.fingerprint.side_effect = lambda request: fingerprint(request)
+        stats = MagicMock()
+
+        def job_dir(**settings) -> str:
+            # As in Crawler.crawl: the spider is created before the settings freeze
+            crawler = Crawler(
+                ProductsSpider,
+                Settings(
+                    {
+                        "LOW_MEMORY_CRAWL": True,
+                        "LOW_MEMORY_JOBDIR": str(tmp_path),
+                        **settings,
+                    }
+                ),
+            )
+            ProductsSpider.from_crawler(crawler)
+            return crawler.settings.get("JOBDIR")
+
+        first_dir = job_dir()
+        first = BloomDupeFilter(1000, 0.01, stats, fingerprinter, path=first_dir)
+        first.request_seen(1)
+        first.close("shutdown")
+
+        new = BloomDupeFilter(1000, 0.01, stats, fingerprinter, path=job_dir())
+        resumed_dir = job_dir(JOBDIR=first_dir)
+        resumed = BloomDupeFilter(1000, 0.01, stats, fingerprinter, path=resumed_dir)
+
+        assert new.request_seen(1) is False
+        assert resumed_dir == first_dir
+        assert resumed.request_seen(1) is True
+
+    def test_settings_have_no_side_effects(self, tmp_path):
+        """Test building a crawler creates no job directory until the crawl starts."""
+        crawler = get_crawler(
+            ProductsSpider,
+            {"LOW_MEMORY_CRAWL": True, "LOW_MEMORY_JOBDIR": str(tmp_path / "jobs")},
+        )
+
+        assert crawler.settings.get("JOBDIR") is None
+        assert not (tmp_path / "jobs").exists()
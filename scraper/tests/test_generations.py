@@ -0,0 +1,82 @@
+import os
+from unittest.mock import MagicMock
+
+import pymongo
+import pytest
+
+from scraper.items import ProductItem
+from scraper.pipelines import MongoPipeline
+
+MONGODB_URI = os.getenv("MONGODB_TEST_URI", "mongodb://localhost:27017")
+DB_NAME = "test_generations"
+
+
+@pytest.fixture
+def db():
+    """Connect to a real Mongo server, since the diff runs as a Mongo aggregation."""
+    client = pymongo.MongoClient(MONGODB_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except pymongo.errors.PyMongoError:
+        pytest.skip(f"No Mongo server at {MONGODB_URI} (set MONGODB_TEST_URI)")
+    client.drop_database(DB_NAME)
+    yield client[DB_NAME]
+    client.drop_database(DB_NAME)
+    client.close()
+
+
+def crawl(generation: int, parts: dict[str, str], reason: str = "finished") -> None:
+    """Run the pipeline over one crawl of the given part numbers and types."""
+    stats = MagicMock()
+    stats.get_stats.side_effect = dict
+    pipeline = MongoPipeline(
+        uri=MONGODB_URI, db=DB_NAME, collection="scraped_items", stats=stats
+    )
+    pipeline.generation = generation
+    pipeline.open_spider(MagicMock())
+    for part_number, part_type in parts.items():
+        item = ProductItem(
+            make="Volvo",
+            category="engine",
+            model="EC210",
+            part_type=part_type,
+            part_number=part_number,
+        )
+        pipeline.process_item(item, None)
+    pipeline.close_spider(MagicMock())
+    pipeline.spider_closed(MagicMock(), reason)
+
+
+def changes(db, generation: int) -> set[tuple]:
+    return {
+        (doc["part_number"], doc["change"], doc["previous_part_type"], doc["part_type"])
+        for doc in db["changes"].find({"generation": generation})
+    }
+
+
+class TestRecordChanges:
+    """Tests for the change feed, against a real Mongo server."""
+
+    def test_records_added_removed_and_changed_parts(self, db):
+        """Test each crawl is diffed against the last complete one."""
+        crawl(1700000000, {"1": "gasket", "2": "filter", "3": "seal"})
+        # Cut short: must not be diffed against, nor become the next baseline
+        crawl(1700000100, {"2": "filter"}, reason="shutdown")
+        crawl(1700000200, {"2": "filter", "3": "o-ring", "4": "bolt"})
+
+        assert changes(db, 1700000000) == {
+            ("1", "added", None, "gasket"),
+            ("2", "added", None, "filter"),
+            ("3", "added", None, "seal"),
+        }
+        assert changes(db, 1700000100) == set()
+        assert changes(db, 1700000200) == {
+            ("1", "removed", "gasket", None),
+            ("3", "changed", "seal", "o-ring"),
+            ("4", "added", None, "bolt"),
+        }
+        generation = db["generations"].find_one({"_id": 1700000200})
+        assert generation["previous"] == 1700000000
+        assert (
+            generation["added"] == generation["removed"] == generation["changed"] == 1
+        )
@@ -0,0 +1,94 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.utils.request import RequestFingerprinter
+
+from scraper.httpcache import BoundedFilesystemCacheStorage
+
+
+@pytest.fixture
+def spider():
+    spider = MagicMock()
+    spider.name = "products-scraper"
+    spider.crawler.request_fingerprinter = RequestFingerprinter()
+    return spider
+
+
+def make_storage(tmp_path, **settings) -> BoundedFilesystemCacheStorage:
+    return BoundedFilesystemCacheStorage(
+        Settings({"HTTPCACHE_DIR": str(tmp_path), "HTTPCACHE_GZIP": True, **settings})
+    )
+
+
+def page(number: int) -> tuple[scrapy.Request, HtmlResponse]:
+    url = f"https://www.urparts.com/page/{number}"
+    request = scrapy.Request(url)
+    response = HtmlResponse(url, body=b"<html>" + b"x" * 1000 + b"</html>")
+    return request, response
+
+
+class TestBoundedFilesystemCacheStorage:
+    """Tests for the size-bounded HTTP cache."""
+
+    def test_round_trip(self, tmp_path, spider):
+        """Test a stored response is served back from the cache."""
+        storage = make_storage(tmp_path)
+        storage.open_spider(spider)
+        request, response = page(1)
+
+        storage.store_response(spider, request, response)
+
+        assert storage.retrieve_response(spider, request).body == response.body
+
+    def test_evicts_least_recently_used(self, tmp_path, spider):
+        """Test the cache drops its least recently used entries past its size."""
+        storage = make_storage(tmp_path)
+        storage.open_spider(spider)
+        for number in range(3):
+            storage.store_response(spider, *page(number))
+        # Room for two of the three entries
+        max_size = storage.size * 5 // 6
+
+        bounded = make_storage(tmp_path, HTTPCACHE_MAX_SIZE=max_size)
+        bounded.open_spider(spider)
+        assert bounded.retrieve_response(spider, page(0)[0]) is None
+
+        # Using page 1 makes page 2 the least recently used one
+        bounded.retrieve_response(spider, page(1)[0])
+        bounded.store_response(spider, *page(3))
+
+        assert bounded.retrieve_response(spider, page(1)[0]) is not None
+        assert bounded.retrieve_response(spider, page(2)[0]) is None
+        assert bounded.size <= max_size
+
+    def test_keeps_recency_across_runs(self, tmp_path, spider):
+        """Test a response served by a previous run is evicted after older ones."""
+        storage = make_storage(tmp_path)
+        storage.open_spider(spider)
+        for number in range(3):
+            storage.store_response(spider, *page(number))
+        storage.retrieve_response(spider, page(0)[0])
+        max_size = storage.size * 5 // 6
+
+        bounded = make_storage(tmp_path, HTTPCACHE_MAX_SIZE=max_size)
+        bounded.open_spider(spider)
+
+        assert bounded.retrieve_response(spider, page(0)[0]) is not None
+        assert bounded.retrieve_response(spider, page(1)[0]) is None
+
+    def test_drops_partially_written_entries(self, tmp_path, spider):
+        """Test an entry interrupted before its last file is written is dropped."""
+        storage = make_storage(tmp_path)
+        storage.open_spider(spider)
+        request, response = page(1)
+        storage.store_response(spider, request, response)
+        entry = Path(storage._get_request_path(spider, request))
+        (entry / "request_body").unlink()
+
+        make_storage(tmp_path).open_spider(spider)
+
+        assert not entry.exists()
@@ -0,0 +1,38 @@
+from scraper import logs
+from scraper.logs import SampledLogger
+
+
+class TestSampledLogger:
+    """Tests for the sampled, rate-limited page logging."""
+
+    def test_sample_rates(self, mocker):
+        """Test callbacks are sampled at their own rate, and kept by default."""
+        mocker.patch.object(logs.random, "random", return_value=0.5)
+        page_log = SampledLogger(
+            sample_rates={"parse_part": 0.1, "parse_model": 0.9}, rate_limit=0
+        )
+
+        assert page_log.allow("parse_part") is False
+        assert page_log.allow("parse_model") is True
+        assert page_log.allow("parse_category") is True
+
+    def test_rate_limit(self, mocker):
+        """Test each callback gets its own budget of records per second."""
+        monotonic = mocker.patch.object(logs.time, "monotonic", return_value=100.0)
+        page_log = SampledLogger(sample_rates={}, rate_limit=2)
+
+        assert [page_log.allow("parse_part") for _ in range(3)] == [True, True, False]
+        assert page_log.allow("parse_model") is True
+
+        monotonic.return_value = 101.0
+        assert page_log.allow("parse_part") is True
+
+    def test_info_counts_dropped_records(self, mocker):
+        """Test dropped records are counted and never reach loguru."""
+        logger = mocker.patch.object(logs, "logger")
+        page_log = SampledLogger(sample_rates={"parse_part": 0.0}, rate_limit=0)
+
+        page_log.info("parse_part", "Parsing parts for model: {model}", model="EC210")
+
+        assert page_log.dropped == 1
+        logger.opt.assert_not_called()
@@ -0,0 +1,95 @@
+import pytest
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from scraper.context import CrawlContext
+from scraper.items import ProductItem
+from scraper.main import ProductsSpider
+
+CATALOGUE = "https://www.urparts.com/index.cfm/page/catalogue"
+
+
+def page(path: str, context: CrawlContext, body: str) -> HtmlResponse:
+    request = scrapy.Request(f"{CATALOGUE}/{path}", meta={"context": context})
+    return HtmlResponse(
+        request.url, body=body.encode(), encoding="utf-8", request=request
+    )
+
+
+@pytest.fixture
+def spider():
+    return ProductsSpider.from_crawler(get_crawler(ProductsSpider))
+
+
+class TestProductsSpider:
+    """Tests for the spider callbacks, on hand-written catalogue pages."""
+
+    def test_parse_model_derives_context(self, spider):
+        """Test each model request carries its own context, derived from the page's."""
+        context = CrawlContext.for_make("Volvo").with_category("engine")
+        response = page(
+            "Volvo/engine",
+            context,
+            '<div class="allmodels"><ul>'
+            '<li><a href="engine/EC210"> EC210 </a></li>'
+            '<li><a href="engine/L120">L120</a></li>'
+            "<li><a>no link</a></li>"
+            "</ul></div>",
+        )
+
+        requests = list(spider.parse_model(response))
+
+        assert [request.url for request in requests] == [
+            f"{CATALOGUE}/Volvo/engine/EC210",
+            f"{CATALOGUE}/Volvo/engine/L120",
+        ]
+        assert [request.meta["context"] for request in requests] == [
+            context.with_model("EC210"),
+            context.with_model("L120"),
+        ]
+        assert all(request.callback == spider.parse_part for request in requests)
+        assert spider.crawler.stats.get_value("parse/missing_href") == 1
+
+    def test_parse_part_yields_every_part(self, spider):
+        """Test every part on a model page is yielded, not just the first one."""
+        context = (
+            CrawlContext.for_make("Volvo").with_category("engine").with_model("EC210")
+        )
+        response = page(
+            "Volvo/engine/EC210",
+            context,
+            '<div class="allparts"><ul>'
+            '<li><a href="/1">00000001 - Gasket<span> Gasket </span></a></li>'
+            '<li><a href="/2">00000002 - Filter<span>FILTER</span></a></li>'
+            '<li><a href="/3">00000003</a></li>'
+            "</ul></div>",
+        )
+
+        parts = list(spider.parse_part(response))
+
+        assert parts == [
+            ProductItem(
+                make="Volvo",
+                category="engine",
+                model="EC210",
+                part_type=part_type,
+                part_number=part_number,
+            )
+            for part_number, part_type in (
+                ("00000001", "gasket"),
+                ("00000002", "filter"),
+                ("00000003", None),
+            )
+        ]
+        assert spider.items_scraped == 3
+
+    def test_parse_part_counts_empty_page(self, spider):
+        """Test a model page without parts is counted instead of logged."""
+        context = (
+            CrawlContext.for_make("Volvo").with_category("engine").with_model("EC210")
+        )
+        response = page("Volvo/engine/EC210", context, "<html></html>")
+
+        assert list(spider.parse_part(response)) == []
+        assert spider.crawler.stats.get_value("parse/no_parts") == 1
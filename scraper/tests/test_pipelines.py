@@ -0,0 +1,109 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from scraper import pipelines
+from scraper.items import ProductItem
+from scraper.pipelines import MongoPipeline
+
+
+@pytest.fixture
+def pipeline(mocker):
+    mocker.patch.object(pipelines.pymongo, "MongoClient")
+    pipeline = MongoPipeline(
+        uri="mongodb://localhost:27017",
+        db="test_db",
+        collection="scraped_items",
+        stats=MagicMock(),
+    )
+    pipeline.open_spider(MagicMock())
+    return pipeline
+
+
+class TestMongoPipeline:
+    """Tests for the Mongo pipeline's crawl generations."""
+
+    def test_tags_items_with_generation(self, pipeline):
+        """Test every item is stored with the crawl's generation."""
+        item = ProductItem(
+            make="Volvo",
+            category="engine",
+            model="EC210",
+            part_type="gasket",
+            part_number="123",
+        )
+
+        pipeline.process_item(item, None)
+
+        pipeline.db["scraped_items"].insert_one.assert_called_once_with(
+            {
+                "make": "Volvo",
+                "category": "engine",
+                "model": "EC210",
+                "part_type": "gasket",
+                "part_number": "123",
+                "generation": pipeline.generation,
+            }
+        )
+
+    def test_records_changes_of_finished_crawl(self, mocker, pipeline):
+        """Test a finished crawl is diffed against the previous generation."""
+        record_changes = mocker.patch.object(
+            pipelines,
+            "record_changes",
+            return_value={"added": 1, "removed": 2, "changed": 3},
+        )
+        generations = pipeline.db["generations"]
+        generations.find_one.return_value = {"_id": 1700000000}
+
+        pipeline.close_spider(MagicMock())
+        pipeline.spider_closed(MagicMock(), "finished")
+
+        record_changes.assert_called_once_with(
+            pipeline.db, "scraped_items", "changes", pipeline.generation, 1700000000
+        )
+        assert generations.insert_one.call_args.args[0]["previous"] == 1700000000
+        pipeline.client.close.assert_called_once()
+
+    def test_skips_changes_of_cancelled_crawl(self, mocker, pipeline):
+        """Test a crawl cut short does not report the parts it missed as removed."""
+        record_changes = mocker.patch.object(pipelines, "record_changes")
+
+        pipeline.close_spider(MagicMock())
+        pipeline.spider_closed(MagicMock(), "shutdown")
+
+        record_changes.assert_not_called()
+        pipeline.client.close.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "stat",
+        [
+            "spider_exceptions/KeyError",
+            # Caught in the callbacks, so never counted as spider exceptions
+            "parse/errors",
+        ],
+    )
+    def test_skips_changes_of_crawl_with_lost_pages(self, mocker, pipeline, stat):
+        """Test a finished crawl that failed to parse some pages is not recorded."""
+        record_changes = mocker.patch.object(pipelines, "record_changes")
+        pipeline.stats.get_stats.return_value = {
+            "downloader/exception_count": 0,
+            stat: 2,
+        }
+
+        pipeline.close_spider(MagicMock())
+        pipeline.spider_closed(MagicMock(), "finished")
+
+        assert pipeline.incomplete_reason("finished") == f"{stat}=2"
+        record_changes.assert_not_called()
+
+    def test_skips_changes_of_replay(self, mocker, pipeline):
+        """Test a crawl replayed from the HTTP cache is never recorded."""
+        record_changes = mocker.patch.object(pipelines, "record_changes")
+        pipeline.replay = True
+
+        pipeline.close_spider(MagicMock())
+        pipeline.spider_closed(MagicMock(), "finished")
+
+        record_changes.assert_not_called()
+        pipeline.client.close.assert_called_once()
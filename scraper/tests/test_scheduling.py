@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, UTC
+
+import pytest
+import scrapy
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.spidermiddlewares.depth import DepthMiddleware
+from scrapy.utils.test import get_crawler
+
+from scraper.context import CrawlContext
+from scraper.main import ProductsSpider
+from scraper.scheduling import CrawlPriorityMiddleware
+
+
+def make_request(depth: int, make: str = "Volvo") -> scrapy.Request:
+    return scrapy.Request(
+        f"https://www.urparts.com/{make}/{depth}",
+        meta={"context": CrawlContext.for_make(make), "depth": depth},
+    )
+
+
+def page(depth: int) -> HtmlResponse:
+    request = scrapy.Request("https://www.urparts.com/", meta={"depth": depth})
+    return HtmlResponse(request.url, body=b"<html></html>", request=request)
+
+
+@pytest.fixture
+def middleware():
+    return CrawlPriorityMiddleware(
+        depth_step=100,
+        make_order="stalest",
+        uri="mongodb://localhost:27017",
+        db="test_db",
+        collection="scraped_items",
+    )
+
+
+class TestCrawlPriorityMiddleware:
+    """Tests for depth-first scheduling and the make ordering middleware."""
+
+    def test_not_configured_without_make_order(self):
+        """Test the middleware is disabled unless CRAWL_MAKE_ORDER is set."""
+        crawler = get_crawler(ProductsSpider, {"CRAWL_MAKE_ORDER": None})
+
+        with pytest.raises(NotConfigured):
+            CrawlPriorityMiddleware.from_crawler(crawler)
+
+    def test_deeper_requests_first(self, middleware):
+        """Test Scrapy's DEPTH_PRIORITY schedules deeper requests first.
+
+        The middlewares are called by keyword, as Scrapy's middleware manager does.
+        """
+        crawler = get_crawler(ProductsSpider, {"DEPTH_PRIORITY": -100})
+        spider = ProductsSpider.from_crawler(crawler)
+        depth = DepthMiddleware.from_crawler(crawler)
+        item = object()
+
+        priorities = []
+        for response_depth in (0, 1, 2):
+            request = scrapy.Request(
+                "https://www.urparts.com/next",
+                meta={"context": CrawlContext.for_make("Volvo")},
+            )
+            output = depth.process_spider_output(
+                response=page(response_depth), result=[request, item], spider=spider
+            )
+            result = list(
+                middleware.process_spider_output(
+                    response=page(response_depth), result=output, spider=spider
+                )
+            )
+            assert item in result
+            priorities.append(result[result.index(request)].priority)
+
+        # The make bonus (depth 1) stays below the next level of depth
+        assert priorities[0] < priorities[1] < priorities[2]
+        assert priorities == [101, 200, 300]
+
+    def test_async_output(self, middleware):
+        """Test the async variant holds back make requests the same way."""
+        item = object()
+        requests = [make_request(1, make) for make in ("Cat", "Volvo")]
+
+        async def result():
+            for obj in [*requests, item]:
+                yield obj
+
+        async def collect():
+            return [
+                obj
+                async for obj in middleware.process_spider_output_async(
+                    response=page(0), result=result(), spider=None
+                )
+            ]
+
+        output = asyncio.run(collect())
+
+        assert output[0] is item
+        assert [request.priority for request in output[1:]] == [2, 1]
+
+    @pytest.mark.parametrize(
+        ("make_order", "expected"),
+        [
+            ("stalest", ["New", "Volvo", "Cat"]),
+            ("smallest", ["New", "Cat", "Volvo"]),
+            ("largest", ["Volvo", "Cat", "New"]),
+        ],
+    )
+    def test_make_order(self, middleware, make_order, expected):
+        """Test make requests are ordered by the stats of previous crawls."""
+        middleware.make_order = make_order
+        middleware.make_stats = {
+            "Volvo": {"count": 50, "last_seen": datetime(2025, 1, 1, tzinfo=UTC)},
+            "Cat": {"count": 10, "last_seen": datetime(2025, 2, 1, tzinfo=UTC)},
+        }
+        requests = [make_request(1, make) for make in ("Cat", "Volvo", "New")]
+
+        result = list(
+            middleware.process_spider_output(
+                response=page(0), result=requests, spider=None
+            )
+        )
+
+        assert [request.meta["context"].make for request in result] == expected
+        assert [request.priority for request in result] == [3, 2, 1]
@@ -0,0 +1,37 @@
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scraper.snapshots import write_snapshot
+
+
+def make_item(number: int) -> dict:
+    return {
+        "make": "Volvo",
+        "category": "engine",
+        "model": f"EC{number % 3}",
+        "part_type": None if number % 2 else "gasket",
+        "part_number": str(number),
+    }
+
+
+class TestWriteSnapshot:
+    """Tests for the columnar catalogue snapshot."""
+
+    def test_write_snapshot(self, tmp_path):
+        """Test a generation is streamed to Parquet in row groups."""
+        collection = MagicMock()
+        collection.find.return_value = [make_item(number) for number in range(5)]
+        path = tmp_path / "snapshots" / "catalogue.parquet"
+
+        rows = write_snapshot(collection, path, generation=1700000000, batch_size=2)
+
+        assert rows == 5
+        assert collection.find.call_args.args[0] == {"generation": 1700000000}
+        snapshot = pq.ParquetFile(path)
+        assert snapshot.metadata.num_row_groups == 3
+        table = snapshot.read()
+        assert table.schema.field("make").type == pa.dictionary(pa.int32(), pa.string())
+        assert table.to_pylist() == [make_item(number) for number in range(5)]
+        assert not path.with_name("catalogue.parquet.tmp").exists()
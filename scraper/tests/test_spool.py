@@ -0,0 +1,151 @@
+import shutil
+from unittest.mock import MagicMock
+
+import pymongo
+import pytest
+
+from scraper.spool import (
+    read_segment,
+    sealed_segments,
+    SpoolDrainer,
+    spooled_id,
+    SpoolWriter,
+)
+
+GENERATION = 1700000000
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return SpoolWriter(tmp_path, segment_items=3, segment_seconds=60)
+
+
+def spooled(writer, count):
+    for value in range(count):
+        writer.append({"part_number": str(value), "generation": GENERATION})
+
+
+def item(value: int) -> dict:
+    return {"part_number": str(value), "generation": GENERATION}
+
+
+class TestSpoolWriter:
+    """Tests for the write-ahead spool segments."""
+
+    def test_seals_full_segments(self, writer, tmp_path):
+        """Test segments are sealed once they hold enough items."""
+        spooled(writer, 7)
+
+        segments = sealed_segments(tmp_path)
+        assert [segment.name for segment in segments] == [
+            "segment-00000001.ndjson.gz",
+            "segment-00000002.ndjson.gz",
+        ]
+        assert list(read_segment(segments[1])) == [item(3), item(4), item(5)]
+
+        writer.seal()
+        assert len(sealed_segments(tmp_path)) == 3
+
+    def test_recovers_active_segment(self, writer, tmp_path):
+        """Test items in a segment that was never closed survive a crash."""
+        spooled(writer, 2)
+        crashed = tmp_path / "crashed"
+        shutil.copy(writer.file_path, crashed)
+        writer.file.close()
+        crashed.replace(writer.file_path)
+
+        recovered = SpoolWriter(tmp_path, segment_items=3, segment_seconds=60)
+
+        segments = sealed_segments(tmp_path)
+        assert len(segments) == 1
+        assert recovered.sequence == 1
+        assert list(read_segment(segments[0])) == [item(0), item(1)]
+
+    def test_seals_stale_segment(self, mocker, writer, tmp_path):
+        """Test a segment is sealed by age, without waiting for another item."""
+        monotonic = mocker.patch("scraper.spool.time.monotonic", return_value=100.0)
+        spooled(writer, 1)
+
+        assert writer.seal_if_stale() is False
+        monotonic.return_value = 160.0
+        assert writer.seal_if_stale() is True
+        assert len(sealed_segments(tmp_path)) == 1
+
+
+class TestSpoolDrainer:
+    """Tests for loading the spool into Mongo."""
+
+    def test_loads_and_deletes_segments(self, writer, tmp_path):
+        """Test every spooled item is bulk-loaded and its segment deleted."""
+        spooled(writer, 5)
+        writer.seal()
+        collection = MagicMock()
+        stats = MagicMock()
+
+        drainer = SpoolDrainer(tmp_path, collection, stats, 2, retry_interval=0.01)
+        drainer.start()
+
+        assert drainer.stop(timeout=5) is True
+        loaded = [
+            doc
+            for call in collection.insert_many.call_args_list
+            for doc in call.args[0]
+        ]
+        assert loaded == [
+            {**item(value), "_id": spooled_id(GENERATION, 1 + value // 3, value % 3)}
+            for value in range(5)
+        ]
+        assert sealed_segments(tmp_path) == []
+
+    def test_resumes_from_checkpoint(self, writer, tmp_path):
+        """Test a failed load keeps the segment and resumes after the last batch."""
+        spooled(writer, 3)
+        collection = MagicMock()
+        collection.insert_many.side_effect = [
+            None,
+            pymongo.errors.AutoReconnect("mongo restarting"),
+        ]
+        drainer = SpoolDrainer(tmp_path, collection, MagicMock(), 2, 0.01)
+        segment = sealed_segments(tmp_path)[0]
+
+        with pytest.raises(pymongo.errors.AutoReconnect):
+            drainer.load_segment(segment)
+
+        collection.insert_many.side_effect = None
+        drainer.load_segment(segment)
+
+        assert collection.insert_many.call_args.args[0] == [
+            {**item(2), "_id": spooled_id(GENERATION, 1, 2)}
+        ]
+        assert not segment.exists()
+
+    def test_reloads_committed_batch_once(self, writer, tmp_path):
+        """Test a batch Mongo committed before failing is not inserted twice."""
+        spooled(writer, 3)
+        stats = MagicMock()
+        collection = MagicMock()
+        collection.insert_many.side_effect = [
+            pymongo.errors.AutoReconnect("connection lost after commit"),
+            pymongo.errors.BulkWriteError(
+                {
+                    "nInserted": 1,
+                    "writeErrors": [
+                        {"index": 0, "code": 11000},
+                        {"index": 1, "code": 11000},
+                    ],
+                }
+            ),
+        ]
+        drainer = SpoolDrainer(tmp_path, collection, stats, 3, 0.01)
+        segment = sealed_segments(tmp_path)[0]
+
+        with pytest.raises(pymongo.errors.AutoReconnect):
+            drainer.load_segment(segment)
+        drainer.load_segment(segment)
+
+        first, second = collection.insert_many.call_args_list
+        assert first == second
+        assert second.kwargs == {"ordered": False}
+        stats.inc_value.assert_any_call("spool/items_duplicate", 2)
+        stats.inc_value.assert_any_call("spool/items_loaded", 1)
+        assert not segment.exists()